@@ -42,6 +42,10 @@ except ImportError:
     TEXTSTAT_AVAILABLE = False
 
 
+# Columns read by PostAnalytics; callers can project to these before rendering
+ANALYTICS_COLUMNS = ['text', 'engagement', 'language', 'length', 'tags']
+
+
 class PostAnalytics:
     def __init__(self, df: pd.DataFrame):
         self.df = df
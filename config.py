@@ -69,8 +69,8 @@ PATHS_CONFIG = {
     "data_dir": "data",
     "main_dataset": "data/processed_posts.json",
     "college_dataset": "data/college_student_posts.json",
-    "history_file": "data/generated_posts_history.json",
-    "templates_file": "data/prompt_templates.json",
+    "history_file": "data/generated_posts_history.jsonl",
+    "templates_file": "data/prompt_templates.jsonl",
     "log_file": "data/app.log",
     "analytics_dir": "data/analytics",
     "backups_dir": "data/backups"
@@ -185,7 +185,11 @@ PERFORMANCE_CONFIG = {
     "request_timeout": 30,
     "retry_attempts": 3,
     "retry_delay": 1,  # seconds
-    "memory_limit_mb": 500
+    "memory_limit_mb": 500,
+    # Serve identical prompts from a cache instead of calling the LLM again.
+    # Off by default so regenerating in the UI gives a fresh post
+    "response_cache": False,
+    "response_cache_dir": "data/llm_cache"
 }
 
 def get_config(section: str) -> Dict[str, Any]:
@@ -0,0 +1,4 @@
+"""
+pytest configuration: the repository root holds both the app modules and the
+test scripts, so pytest's rootdir on sys.path is all the tests need to import them
+"""
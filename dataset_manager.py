@@ -4,7 +4,9 @@ Handles all dataset operations and state management
 """
 import os
 import json
-from typing import Dict, List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 try:
     import streamlit as st
@@ -16,6 +18,10 @@ except ImportError:
 class DatasetManager:
     def __init__(self):
         self.data_dir = "data"
+        # path -> ((mtime_ns, size), is_processed), so unchanged files aren't re-parsed
+        self._processed_cache = {}
+        # Streamlit sessions share this manager, each on its own script thread
+        self._processed_cache_lock = threading.Lock()
         self.ensure_data_directory()
         
     def ensure_data_directory(self):
@@ -23,10 +29,8 @@ class DatasetManager:
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
     
-    def get_available_datasets(self) -> Dict[str, str]:
-        """Get all available datasets with display names - only return processed datasets"""
-        datasets = {}
-        
+    def _scan_dataset_files(self) -> List[Tuple[str, str]]:
+        """List (filename, path) pairs for candidate dataset files in the data directory"""
         # System files to exclude
         system_files = {
             'dataset_mappings.json',
@@ -35,20 +39,32 @@ class DatasetManager:
             'analytics_report.json'
         }
         
-        if os.path.exists(self.data_dir):
-            for file in os.listdir(self.data_dir):
-                if (file.endswith('.json') and 
-                    not file.endswith('_metadata.json') and 
-                    not file.endswith('_history.json') and
-                    file not in system_files):
-                    
-                    file_path = os.path.join(self.data_dir, file)
-                    
-                    # Check if this is a properly processed dataset
-                    if self._is_processed_dataset(file_path):
-                        # Create display name from filename
-                        display_name = self._create_display_name(file)
-                        datasets[display_name] = file_path
+        if not os.path.exists(self.data_dir):
+            return []
+        
+        # scandir yields the path along with each entry, saving a join per file
+        with os.scandir(self.data_dir) as entries:
+            return [
+                (entry.name, entry.path) for entry in entries
+                if (entry.is_file() and
+                    entry.name.endswith('.json') and 
+                    not entry.name.endswith('_metadata.json') and 
+                    not entry.name.endswith('_history.json') and
+                    entry.name not in system_files)
+            ]
+    
+    def get_available_datasets(self) -> Dict[str, str]:
+        """Get all available datasets with display names - only return processed datasets"""
+        datasets = {}
+        
+        files = self._scan_dataset_files()
+        flags = self._processed_flags([file_path for _, file_path in files])
+        for (file, file_path), is_processed in zip(files, flags):
+            # Check if this is a properly processed dataset
+            if is_processed:
+                # Create display name from filename
+                display_name = self._create_display_name(file)
+                datasets[display_name] = file_path
         
         return datasets
     
@@ -181,6 +197,7 @@ class DatasetManager:
         try:
             if os.path.exists(dataset_path):
                 os.remove(dataset_path)
+                self.invalidate()
                 
                 # If this was the current dataset, switch to another one
                 if self.get_current_dataset() == dataset_path:
@@ -279,31 +296,55 @@ class DatasetManager:
             print(f"Error checking dataset {dataset_path}: {e}")
             return False
 
+    def _processed_flags(self, dataset_paths: List[str]) -> List[bool]:
+        """_is_processed_dataset for each path, remembered until a file's mtime or size changes"""
+        versions = {}
+        for dataset_path in dataset_paths:
+            try:
+                stat = os.stat(dataset_path)
+            except OSError:
+                continue
+            versions[dataset_path] = (stat.st_mtime_ns, stat.st_size)
+        
+        flags, stale = {}, []
+        with self._processed_cache_lock:
+            for path, version in versions.items():
+                cached = self._processed_cache.get(path)
+                if cached and cached[0] == version:
+                    flags[path] = cached[1]
+                else:
+                    stale.append(path)
+        
+        # Workers only read files; the cache is updated here once they are done
+        if len(stale) > 1:
+            # Each check is mostly file I/O, so overlap the reads
+            with ThreadPoolExecutor(max_workers=min(8, len(stale))) as executor:
+                results = list(executor.map(self._is_processed_dataset, stale))
+        else:
+            results = [self._is_processed_dataset(path) for path in stale]
+        
+        with self._processed_cache_lock:
+            for path, is_processed in zip(stale, results):
+                self._processed_cache[path] = (versions[path], is_processed)
+                flags[path] = is_processed
+        return [flags.get(path, False) for path in dataset_paths]
+    
+    def invalidate(self):
+        """Forget cached dataset classifications so the next listing re-checks every file"""
+        with self._processed_cache_lock:
+            self._processed_cache.clear()
+
     def get_raw_datasets(self) -> Dict[str, str]:
         """Get raw (unprocessed) datasets that can be processed"""
         raw_datasets = {}
         
-        # System files to exclude
-        system_files = {
-            'dataset_mappings.json',
-            'prompt_templates.json', 
-            'generated_posts_history.json',
-            'analytics_report.json'
-        }
-        
-        if os.path.exists(self.data_dir):
-            for file in os.listdir(self.data_dir):
-                if (file.endswith('.json') and 
-                    not file.endswith('_metadata.json') and 
-                    not file.endswith('_history.json') and
-                    file not in system_files):
-                    
-                    file_path = os.path.join(self.data_dir, file)
-                    
-                    # Check if this is a raw dataset (not processed)
-                    if not self._is_processed_dataset(file_path):
-                        display_name = self._create_display_name(file, is_raw=True)
-                        raw_datasets[display_name] = file_path
+        files = self._scan_dataset_files()
+        flags = self._processed_flags([file_path for _, file_path in files])
+        for (file, file_path), is_processed in zip(files, flags):
+            # Check if this is a raw dataset (not processed)
+            if not is_processed:
+                display_name = self._create_display_name(file, is_raw=True)
+                raw_datasets[display_name] = file_path
         
         return raw_datasets
 
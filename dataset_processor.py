@@ -2,6 +2,7 @@
 Enhanced Dataset Processor for LinkedIn Post Generator
 Automatically processes raw datasets into structured format
 """
+import codecs
 import json
 import os
 import pandas as pd
@@ -11,11 +12,29 @@ from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.exceptions import OutputParserException
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 import streamlit as st
 
 logger = logging.getLogger(__name__)
 
+# Stats key -> column tallied with value_counts in get_processing_stats
+STATS_COUNT_COLUMNS = {
+    'languages': 'language',
+    'lengths': 'length',
+    'tones': 'tone',
+    'audiences': 'target_audience'
+}
+
+def _is_plain_utf8(data: bytes) -> bool:
+    """True when `data` is UTF-8 without a byte order mark (no NULs, so not UTF-16)"""
+    if data.startswith(codecs.BOM_UTF8) or b'\x00' in data:
+        return False
+    try:
+        data.decode('utf-8')
+    except UnicodeDecodeError:
+        return False
+    return True
+
 class DatasetProcessor:
     def __init__(self):
         self.processed_datasets = {}
@@ -33,7 +52,8 @@ class DatasetProcessor:
         """
         try:
             # Load raw data
-            raw_data = json.load(uploaded_file)
+            raw_bytes = uploaded_file.read()
+            raw_data = json.loads(raw_bytes)
             
             # Validate raw data format
             if not isinstance(raw_data, list):
@@ -45,9 +65,16 @@ class DatasetProcessor:
             else:
                 raw_filename = f"data/{dataset_name}.json"
             
-            # Save the raw dataset
-            with open(raw_filename, 'w', encoding='utf-8') as f:
-                json.dump(raw_data, f, indent=2, ensure_ascii=False)
+            # Save the raw dataset; plain UTF-8 uploads are already valid JSON, so
+            # write their bytes as-is instead of re-serializing every post.
+            # BOM-prefixed or UTF-16 exports are re-serialized, since every
+            # reader opens dataset files as plain UTF-8
+            if _is_plain_utf8(raw_bytes):
+                with open(raw_filename, 'wb') as f:
+                    f.write(raw_bytes)
+            else:
+                with open(raw_filename, 'w', encoding='utf-8') as f:
+                    json.dump(raw_data, f, indent=2, ensure_ascii=False)
             
             st.success(f"✅ Raw dataset saved: {raw_filename}")
             
@@ -249,8 +276,8 @@ class DatasetProcessor:
             raise
             raise
     
-    def process_existing_raw_dataset(self, raw_file_path: str, processed_file_path: str):
-        """Process an existing raw dataset file"""
+    def process_existing_raw_dataset(self, raw_file_path: str, processed_file_path: str) -> pd.DataFrame:
+        """Process an existing raw dataset file and return the processed posts as a DataFrame"""
         try:
             with open(raw_file_path, 'r', encoding='utf-8') as f:
                 raw_data = json.load(f)
@@ -262,29 +289,28 @@ class DatasetProcessor:
                     processed_posts.append(processed_post)
             
             self.save_processed_dataset(processed_posts, processed_file_path)
-            return processed_file_path
+            # Callers can reuse the frame instead of parsing the file they just wrote
+            return pd.DataFrame(processed_posts)
             
         except Exception as e:
             logger.error(f"Error processing existing dataset: {e}")
             raise
     
-    def get_processing_stats(self, processed_file_path: str) -> Dict[str, Any]:
-        """Get statistics about a processed dataset"""
+    def get_processing_stats(self, processed_dataset: Union[str, pd.DataFrame]) -> Dict[str, Any]:
+        """Get statistics about a processed dataset, given its file path or a loaded DataFrame"""
         try:
-            with open(processed_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            df = pd.DataFrame(data)
-            
-            stats = {
-                'total_posts': len(df),
-                'languages': df['language'].value_counts().to_dict() if 'language' in df.columns else {},
-                'lengths': df['length'].value_counts().to_dict() if 'length' in df.columns else {},
-                'tones': df['tone'].value_counts().to_dict() if 'tone' in df.columns else {},
-                'audiences': df['target_audience'].value_counts().to_dict() if 'target_audience' in df.columns else {},
-                'avg_engagement': df['engagement'].mean() if 'engagement' in df.columns else 0,
-                'total_tags': len(set([tag for tags in df['tags'] for tag in tags])) if 'tags' in df.columns else 0
-            }
+            if isinstance(processed_dataset, pd.DataFrame):
+                df = processed_dataset
+            else:
+                with open(processed_dataset, 'r', encoding='utf-8') as f:
+                    df = pd.DataFrame(json.load(f))
+            
+            stats = {'total_posts': len(df)}
+            for key, column in STATS_COUNT_COLUMNS.items():
+                stats[key] = df[column].value_counts().to_dict() if column in df.columns else {}
+            stats['avg_engagement'] = df['engagement'].mean() if 'engagement' in df.columns else 0
+            # explode() flattens the tag lists so pandas counts distinct tags without a Python set
+            stats['total_tags'] = int(df['tags'].explode().nunique()) if 'tags' in df.columns else 0
             
             return stats
             
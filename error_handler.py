@@ -213,8 +213,8 @@ def ensure_data_directory():
         
         # Create necessary files if they don't exist
         files_to_create = [
-            "data/generated_posts_history.json",
-            "data/prompt_templates.json",
+            "data/generated_posts_history.jsonl",
+            "data/prompt_templates.jsonl",
             "data/app.log"
         ]
         
@@ -1,12 +1,17 @@
+import numpy as np
 import pandas as pd
 import json
 import os
 
+# Low-cardinality text columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = ['language', 'length', 'tone', 'target_audience']
+
 
 class FewShotPosts:
     def __init__(self, file_path="data/processed_posts.json"):
         self.df = None
-        self.unique_tags = None
+        self.unique_tags = ()
+        self._tag_index = None
         self.file_path = file_path
         self.load_posts(file_path)
 
@@ -15,40 +20,81 @@ class FewShotPosts:
         try:
             with open(file_path, encoding="utf-8") as f:
                 posts = json.load(f)
-                self.df = pd.json_normalize(posts)
-                
-                # Ensure required columns exist
-                if 'line_count' not in self.df.columns:
-                    self.df['line_count'] = self.df['text'].apply(lambda x: len(x.split('\n')))
-                
-                if 'length' not in self.df.columns:
-                    self.df['length'] = self.df['line_count'].apply(self.categorize_length)
-                
-                if 'engagement' not in self.df.columns:
-                    self.df['engagement'] = 0  # Default engagement
-                
-                # Process tags - handle both formats properly
-                if 'tags' in self.df.columns:
-                    self.df['tags'] = self.df['tags'].apply(self.ensure_list)
-                    all_tags = []
-                    for tags_list in self.df['tags']:
-                        if isinstance(tags_list, list):
-                            all_tags.extend(tags_list)
-                    self.unique_tags = list(set(all_tags))
-                else:
-                    self.unique_tags = []
-                    
-                print(f"✅ Loaded {len(self.df)} posts from {file_path}")
-                print(f"📊 Found {len(self.unique_tags)} unique tags")
-                    
+            self._prepare_frame(pd.json_normalize(posts), file_path)
         except FileNotFoundError:
             print(f"❌ File {file_path} not found. Creating empty dataset.")
             self.df = pd.DataFrame(columns=['text', 'engagement', 'line_count', 'language', 'tags', 'length'])
-            self.unique_tags = []
+            self.unique_tags = ()
         except Exception as e:
             print(f"❌ Error loading posts: {e}")
             self.df = pd.DataFrame()
-            self.unique_tags = []
+            self.unique_tags = ()
+
+    @classmethod
+    def from_dataframe(cls, df, file_path=None):
+        """Build an instance from posts already in memory instead of reading them from disk"""
+        fs = cls.__new__(cls)
+        fs.df = None
+        fs.unique_tags = ()
+        fs._tag_index = None
+        fs.file_path = file_path
+        # Work on a copy so the caller's frame keeps its dtypes
+        fs._prepare_frame(df.copy(), file_path or "DataFrame")
+        return fs
+
+    def _prepare_frame(self, df, source):
+        """Fill in derived columns, compact dtypes and index tags for a freshly loaded frame"""
+        self.df = df
+        
+        # Ensure required columns exist
+        if 'line_count' not in self.df.columns:
+            self.df['line_count'] = self.df['text'].apply(lambda x: len(x.split('\n')))
+        
+        if 'length' not in self.df.columns:
+            self.df['length'] = self.df['line_count'].apply(self.categorize_length)
+        
+        if 'engagement' not in self.df.columns:
+            self.df['engagement'] = 0  # Default engagement
+        
+        self._compact_dtypes()
+        
+        # Process tags - handle both formats properly
+        if 'tags' in self.df.columns:
+            self.df['tags'] = self.df['tags'].apply(self.ensure_list)
+            self._set_unique_tags(self._all_tags())
+        else:
+            self.unique_tags = ()
+        
+        self._build_tag_index()
+            
+        print(f"✅ Loaded {len(self.df)} posts from {source}")
+        print(f"📊 Found {len(self.unique_tags)} unique tags")
+
+    def _compact_dtypes(self):
+        """Store repeated labels as categoricals and engagement in the smallest integer type"""
+        for column in CATEGORICAL_COLUMNS:
+            if column in self.df.columns:
+                self.df[column] = self.df[column].astype('category').cat.remove_unused_categories()
+        
+        if 'engagement' in self.df.columns:
+            try:
+                self.df['engagement'] = pd.to_numeric(self.df['engagement'], downcast='integer')
+            except (ValueError, TypeError):
+                pass  # Leave non-numeric engagement values as they are
+
+    def _build_tag_index(self):
+        """Map each tag to the sorted row positions of the posts that carry it"""
+        self._tag_index = None
+        if 'tags' not in self.df.columns:
+            return
+        
+        tags = self.df['tags'].reset_index(drop=True)
+        exploded = tags.apply(lambda x: x if isinstance(x, list) else []).explode().dropna()
+        try:
+            rows = pd.Series(exploded.index.to_numpy()).groupby(exploded.to_numpy())
+            self._tag_index = {tag: np.unique(positions.to_numpy()) for tag, positions in rows}
+        except TypeError:
+            pass  # Unhashable tags: get_filtered_posts falls back to scanning
 
     def ensure_list(self, tags):
         """Ensure tags is always a list"""
@@ -59,17 +105,30 @@ class FewShotPosts:
         else:
             return []
 
-    def get_filtered_posts(self, length, language, tag):
-        """Get posts filtered by length, language, and tag"""
+    def get_filtered_posts(self, length, language, tag, limit=None):
+        """Get posts filtered by length, language, and tag; at most `limit` if given"""
         try:
             if self.df.empty:
                 return []
                 
-            df_filtered = self.df[
-                (self.df['tags'].apply(lambda tags: tag in tags if isinstance(tags, list) else False)) &
-                (self.df['language'] == language) &
-                (self.df['length'] == length)
-            ]
+            if self._tag_index is not None:
+                # Only the posts carrying the tag need the language/length check
+                rows = self._tag_index.get(tag)
+                if rows is None:
+                    return []
+                candidates = self.df.iloc[rows]
+                df_filtered = candidates[
+                    (candidates['language'] == language) &
+                    (candidates['length'] == length)
+                ]
+            else:
+                df_filtered = self.df[
+                    (self.df['tags'].apply(lambda tags: tag in tags if isinstance(tags, list) else False)) &
+                    (self.df['language'] == language) &
+                    (self.df['length'] == length)
+                ]
+            if limit is not None:
+                df_filtered = df_filtered.head(limit)
             return df_filtered.to_dict(orient='records')
         except Exception as e:
             print(f"Error filtering posts: {e}")
@@ -84,9 +143,18 @@ class FewShotPosts:
         else:
             return "Long"
 
+    def _all_tags(self):
+        """One row per tag occurrence across all posts"""
+        tags = self.df['tags'].apply(lambda x: x if isinstance(x, list) else [])
+        return tags.explode().dropna()
+
+    def _set_unique_tags(self, tags):
+        """Store the distinct tags once, sorted, so get_tags() is a plain attribute read"""
+        self.unique_tags = tuple(sorted(set(tags), key=str))
+
     def get_tags(self):
         """Get all unique tags"""
-        return self.unique_tags if self.unique_tags else []
+        return self.unique_tags
 
     def add_posts(self, new_posts):
         """Add new posts to the dataset"""
@@ -105,10 +173,11 @@ class FewShotPosts:
             # Add to DataFrame
             new_df = pd.json_normalize(new_posts)
             self.df = pd.concat([self.df, new_df], ignore_index=True)
+            self._compact_dtypes()
+            self._build_tag_index()
             
             # Update tags
-            all_tags = self.df['tags'].apply(lambda x: x if isinstance(x, list) else []).sum()
-            self.unique_tags = list(set(all_tags))
+            self._set_unique_tags(self._all_tags())
             
             return True
         except Exception as e:
@@ -146,8 +215,8 @@ class FewShotPosts:
             
             # Get top tags
             if 'tags' in self.df.columns:
-                all_tags = self.df['tags'].apply(lambda x: x if isinstance(x, list) else []).sum()
-                tag_counts = pd.Series(all_tags).value_counts()
+                # explode avoids concatenating every tag list into one Python list
+                tag_counts = self._all_tags().value_counts()
                 stats['top_tags'] = tag_counts.head(10).to_dict()
             
             # Add tone statistics if available
@@ -197,10 +266,11 @@ class FewShotPosts:
                 
                 # Remove duplicates based on text content
                 self.df = self.df.drop_duplicates(subset=['text'], keep='first')
+                self._compact_dtypes()
+                self._build_tag_index()
                 
                 # Update tags
-                all_tags = self.df['tags'].apply(lambda x: x if isinstance(x, list) else []).sum()
-                self.unique_tags = list(set(all_tags))
+                self._set_unique_tags(self._all_tags())
                 
                 return True
             return False
@@ -1,17 +1,38 @@
 import streamlit as st
+import codecs
 import json
 import os
-from few_shot import FewShotPosts
-from post_generator import generate_post, generate_custom_post
+import re
+import time
+from collections import deque
 from datetime import datetime
-import pandas as pd
 from error_handler import (
     validate_post_data, safe_file_operation, handle_llm_error,
     check_api_key, sanitize_input
 )
-from analytics import show_analytics_dashboard
 from dataset_manager import dataset_manager
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+    JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError)
+except ImportError:
+    IJSON_AVAILABLE = False
+    JSON_ERRORS = (json.JSONDecodeError,)
+
+# pandas, few_shot, analytics and post_generator are imported inside the
+# pages that use them so a cold start only pays for the page being visited
+
+# Reruns scoped to a fragment; st.fragment replaced st.experimental_fragment
+# in newer Streamlit releases
+fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
 # Configure the page
 st.set_page_config(
     page_title="LinkedIn Post Generator",
@@ -21,7 +42,7 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling
-st.markdown("""
+_CSS = """
 <style>
     .main-header {
         text-align: center;
@@ -105,40 +126,261 @@ st.markdown("""
         border-radius: 5px;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-# Options for length and language
-length_options = ["Short", "Medium", "Long"]
-language_options = ["English", "Hinglish"]
-post_types = ["General", "College Student Journey", "Professional", "Technical"]
-tones = ["Professional", "Casual", "Humorous", "Inspirational", "Educational"]
+# Options for length and language; tuples so reruns can't mutate widget options
+length_options = ("Short", "Medium", "Long")
+language_options = ("English", "Hinglish")
+post_types = ("General", "College Student Journey", "Professional", "Technical")
+tones = ("Professional", "Casual", "Humorous", "Inspirational", "Educational")
 
-def save_generated_post(post_content, metadata):
-    """Save generated posts to history"""
-    history_file = "data/generated_posts_history.json"
+# Comma separator for the custom-post keywords, swallowing surrounding spaces
+_KW_SPLIT = re.compile(r"\s*,\s*")
+
+# Timestamp format used in the post history view
+HISTORY_TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+# Post history is stored as newline-delimited JSON, one entry per line
+HISTORY_FILE = "data/generated_posts_history.jsonl"
+LEGACY_HISTORY_FILE = "data/generated_posts_history.json"
+MAX_HISTORY = 100
+# Appends grow the file without bound; once it passes this size it is
+# trimmed back to the last MAX_HISTORY entries
+HISTORY_COMPACT_BYTES = 1024 * 1024
+
+# Prompt templates use the same line-delimited format
+TEMPLATES_FILE = "data/prompt_templates.jsonl"
+LEGACY_TEMPLATES_FILE = "data/prompt_templates.json"
+
+def _dumps_line(entry):
+    """Serialize a history entry as one UTF-8 encoded JSON line"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(entry) + b"\n"
+    return (json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8')
+
+def _loads_json(data):
+    """Parse JSON from bytes, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Byte order marks json.loads understands but ijson and orjson reject
+_ENCODING_BOMS = (
+    codecs.BOM_UTF8, codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE,
+    codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE
+)
+
+def _preview_upload(uploaded_file, limit=2):
+    """Count the posts in an uploaded JSON array and return the first `limit` of them"""
+    uploaded_file.seek(0)
+    head = uploaded_file.read(1024)
+    uploaded_file.seek(0)
     
-    if os.path.exists(history_file):
-        with open(history_file, 'r', encoding='utf-8') as f:
-            history = json.load(f)
+    if head.startswith(_ENCODING_BOMS) or b'\x00' in head[:4]:
+        # BOM-prefixed or UTF-16/32 exports; json.loads detects the encoding
+        posts = json.loads(uploaded_file.getvalue())
+    elif IJSON_AVAILABLE and head.lstrip().startswith(b'['):
+        # Stream the array so only `limit` posts are ever held in memory
+        count, preview = 0, []
+        for count, post in enumerate(ijson.items(uploaded_file, 'item', use_float=True), 1):
+            if count <= limit:
+                preview.append(post)
+        uploaded_file.seek(0)
+        return count, preview
     else:
-        history = []
+        posts = _loads_json(uploaded_file.getvalue())
+    
+    if not isinstance(posts, list):
+        raise ValueError("Dataset must be a JSON array of posts")
+    return len(posts), posts[:limit]
+
+def _migrate_legacy_json(legacy_path, path, limit=None):
+    """Convert an old JSON-array file to the line-delimited format, then set the
+    old file aside as `*.migrated` so it is never imported twice"""
+    if not os.path.exists(legacy_path):
+        return
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        # Already converted (before legacy files were set aside)
+        os.replace(legacy_path, legacy_path + ".migrated")
+        return
+    
+    try:
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return
+    
+    tmp_file = path + ".tmp"
+    with open(tmp_file, 'wb') as f:
+        for entry in entries[-limit:] if limit else entries:
+            f.write(_dumps_line(entry))
+    os.replace(tmp_file, path)
+    os.replace(legacy_path, legacy_path + ".migrated")
+
+def _migrate_legacy_history():
+    """Convert the old JSON-array history file to the line-delimited format"""
+    _migrate_legacy_json(LEGACY_HISTORY_FILE, HISTORY_FILE, MAX_HISTORY)
+
+def _compact_history():
+    """Rewrite the history file keeping only the last MAX_HISTORY entries"""
+    with open(HISTORY_FILE, 'rb') as f:
+        entries = deque((line for line in f if line.strip()), maxlen=MAX_HISTORY)
+    
+    tmp_file = HISTORY_FILE + ".tmp"
+    with open(tmp_file, 'wb') as f:
+        f.writelines(entries)
+    os.replace(tmp_file, HISTORY_FILE)
+
+def save_generated_post(post_content, metadata):
+    """Append a generated post to the history file"""
+    _migrate_legacy_history()
     
     new_entry = {
-        "timestamp": datetime.now().isoformat(),
+        "ts": time.time_ns(),  # formatted only when the history is displayed
         "content": post_content,
         "metadata": metadata
     }
     
-    history.append(new_entry)
+    with open(HISTORY_FILE, 'ab') as f:
+        f.write(_dumps_line(new_entry))
     
-    # Keep only last 100 posts
-    if len(history) > 100:
-        history = history[-100:]
+    if os.path.getsize(HISTORY_FILE) > HISTORY_COMPACT_BYTES:
+        _compact_history()
+
+def _file_version(path: str):
+    """(mtime_ns, size) of a file; changes on every append or rewrite, None if missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+@st.cache_data(ttl=60, max_entries=4)
+def _load_history(path: str, version):
+    """Load the last MAX_HISTORY posts as a flat DataFrame, reparsed when `version` changes"""
+    import pandas as pd
+    
+    with open(path, 'rb') as f:
+        entries = deque((_loads_json(line) for line in f if line.strip()), maxlen=MAX_HISTORY)
+    
+    # Flatten metadata into 'metadata.<key>' columns so filters are vectorized
+    history = pd.json_normalize(list(entries))
+    # Filter columns hold a handful of repeated values; categoricals compare
+    # by integer code and store each string once
+    for column in ('metadata.language', 'metadata.length'):
+        if column not in history.columns:
+            history[column] = None
+        history[column] = history[column].astype('category')
     
-    with open(history_file, 'w', encoding='utf-8') as f:
-        json.dump(history, f, indent=2, ensure_ascii=False)
+    # Format display times once per load. New entries store integer
+    # nanoseconds in 'ts', older ones an ISO 'timestamp' in local time
+    created = pd.Series(pd.NaT, index=history.index, dtype='datetime64[ns]')
+    if 'timestamp' in history.columns:
+        created = pd.to_datetime(history['timestamp'], format='ISO8601', errors='coerce')
+    if 'ts' in history.columns:
+        local_tz = datetime.now().astimezone().tzinfo
+        from_ts = pd.to_datetime(history['ts'], unit='ns', utc=True).dt.tz_convert(local_tz)
+        created = from_ts.dt.tz_localize(None).fillna(created)
+    history['created'] = created.dt.strftime(HISTORY_TIME_FORMAT)
+    return history
+
+def _mtime(path: str) -> float:
+    """Modification time used to key file-derived caches; 0.0 for missing files"""
+    return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+@st.cache_resource
+def _few_shot_class():
+    """Import FewShotPosts (and pandas with it) on first use; None if unavailable"""
+    try:
+        from few_shot import FewShotPosts
+    except ImportError:
+        return None
+    return FewShotPosts
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _load_few_shot(dataset_path: str, mtime: float):
+    """Parse a dataset once per file version and share it across reruns and pages"""
+    return _few_shot_class()(dataset_path)
+
+def get_few_shot(dataset_path: str):
+    """Cached FewShotPosts for a dataset, reloaded when the file changes on disk"""
+    return _load_few_shot(dataset_path, _mtime(dataset_path))
+
+@st.cache_data(max_entries=8)
+def _tags_for(dataset_path: str, mtime: float):
+    """Unique tags of a dataset, memoized per dataset file version"""
+    return get_few_shot(dataset_path).get_tags()
+
+@st.cache_data(max_entries=64)
+def _filtered(dataset_path: str, mtime: float, length: str, language: str, tag: str):
+    """Reference posts matching the generation filters, memoized per file version and filters"""
+    return get_few_shot(dataset_path).get_filtered_posts(length, language, tag)
+
+@st.cache_data(ttl=30)
+def _list_datasets(data_dir: str) -> dict:
+    """Processed datasets in `data_dir`, rescanned at most every 30 seconds or on refresh"""
+    return dataset_manager.get_available_datasets()
+
+@st.cache_data(ttl=30)
+def _list_raw_datasets(data_dir: str) -> dict:
+    """Raw datasets in `data_dir`, cached like _list_datasets"""
+    return dataset_manager.get_raw_datasets()
+
+def _clear_dataset_lists():
+    """Force the next run to rescan the data directory"""
+    _list_datasets.clear()
+    _list_raw_datasets.clear()
+    dataset_manager.invalidate()
+
+def _current_dataset_name():
+    """Display name of the current dataset, resolved from the cached dataset list"""
+    current_dataset = dataset_manager.get_current_dataset()
+    for display_name, file_path in _list_datasets(dataset_manager.data_dir).items():
+        if file_path == current_dataset:
+            return display_name
+    return dataset_manager.get_current_dataset_name()
+
+@st.cache_data(persist="disk", max_entries=8)
+def get_dataset_stats(dataset_path: str, mtime: float):
+    """Dataset statistics, persisted across restarts; `mtime` invalidates them when the file changes"""
+    return dataset_manager.get_dataset_statistics(dataset_path)
+
+def get_analytics_frame(df):
+    """Project a dataset DataFrame down to the columns the analytics dashboard reads"""
+    from analytics import ANALYTICS_COLUMNS
+    
+    return df[[col for col in ANALYTICS_COLUMNS if col in df.columns]]
+
+@st.cache_resource
+def _api_key_found() -> bool:
+    return check_api_key()
+
+def _api_key_configured() -> bool:
+    """check_api_key() re-reads .env, so remember a positive result for the process"""
+    if _api_key_found():
+        return True
+    # Don't keep a negative result: the user may fix .env without a restart
+    _api_key_found.clear()
+    return False
+
+@st.cache_resource
+def _page_css() -> str:
+    """The stylesheet with whitespace collapsed, built once per server process"""
+    return re.sub(r"\s+", " ", _CSS).strip()
+
+def _on_dataset_selected():
+    """Apply the sidebar dataset choice before the script reruns"""
+    selected_name = st.session_state.global_dataset_selector
+    available_datasets = _list_datasets(dataset_manager.data_dir)
+    if selected_name in available_datasets:
+        dataset_manager.set_current_dataset(available_datasets[selected_name])
 
 def main():
+    # Streamlit drops elements that are not re-emitted on a rerun, so the
+    # stylesheet is sent every run rather than once per session; minifying it
+    # keeps that payload small
+    st.markdown(_page_css(), unsafe_allow_html=True)
+    
     # Header
     st.markdown("""
     <div class="main-header">
@@ -162,35 +404,33 @@ def main():
         st.markdown("### 🗄️ Dataset Selection")
         
         # Get available datasets
-        available_datasets = dataset_manager.get_available_datasets()
+        available_datasets = _list_datasets(dataset_manager.data_dir)
+        # Seed the session's dataset from the cached list so the manager does
+        # not rescan the data directory to pick a default
+        if available_datasets:
+            st.session_state.setdefault('current_dataset', next(iter(available_datasets.values())))
         current_dataset = dataset_manager.get_current_dataset()
         
-        # Find current dataset display name
-        current_display_name = None
-        for display_name, file_path in available_datasets.items():
-            if file_path == current_dataset:
-                current_display_name = display_name
-                break
+        # Find the position of the current dataset, falling back to the first one
+        dataset_names = list(available_datasets)
+        path_to_index = {file_path: i for i, file_path in enumerate(available_datasets.values())}
+        current_index = path_to_index.get(current_dataset)
         
-        if not current_display_name and available_datasets:
-            current_display_name = list(available_datasets.keys())[0]
-            dataset_manager.set_current_dataset(available_datasets[current_display_name])
+        if current_index is None and available_datasets:
+            current_index = 0
+            dataset_manager.set_current_dataset(available_datasets[dataset_names[0]])
         
         # Dataset selector
         if available_datasets:
             selected_dataset_name = st.selectbox(
                 "Choose Dataset:", 
-                list(available_datasets.keys()),
-                index=list(available_datasets.keys()).index(current_display_name) if current_display_name else 0,
-                key="global_dataset_selector"
+                dataset_names,
+                index=current_index,
+                key="global_dataset_selector",
+                on_change=_on_dataset_selected
             )
             
             selected_dataset_path = available_datasets[selected_dataset_name]
-            
-            # Update current dataset if changed
-            if current_dataset != selected_dataset_path:
-                dataset_manager.set_current_dataset(selected_dataset_path)
-                st.rerun()
         else:
             st.markdown("""
             <div style="background: #fff3cd; border: 1px solid #ffeaa7; border-radius: 8px; padding: 1rem; margin: 1rem 0;">
@@ -202,9 +442,10 @@ def main():
             """, unsafe_allow_html=True)
             selected_dataset_path = None
         
-        # Add refresh button
-        if st.button("🔄 Refresh Datasets", help="Refresh the dataset list"):
-            st.rerun()
+        # Add refresh button; the callback clears the cached lists before the
+        # button's own rerun, so no extra st.rerun() is needed
+        st.button("🔄 Refresh Datasets", help="Refresh the dataset list",
+                  on_click=_clear_dataset_lists)
         
         st.markdown("---")
         st.markdown("### 📋 Quick Stats")
@@ -212,7 +453,7 @@ def main():
         # Show current dataset stats
         if selected_dataset_path and dataset_manager.dataset_exists(selected_dataset_path):
             try:
-                stats = dataset_manager.get_dataset_statistics(selected_dataset_path)
+                stats = get_dataset_stats(selected_dataset_path, _mtime(selected_dataset_path))
                 if stats:
                     col1, col2, col3 = st.columns(3)
                     with col1:
@@ -223,14 +464,14 @@ def main():
                         st.metric("Categories", len(stats.get("lengths", {})))
                     
                     # Show current dataset name
-                    st.success(f"📊 **Active:** {dataset_manager.get_current_dataset_name()}")
+                    st.success(f"📊 **Active:** {_current_dataset_name()}")
             except Exception as e:
                 st.error(f"Error loading stats: {e}")
         elif available_datasets:
             st.info("📊 Select a dataset above to view statistics")
         else:
             # Check for raw datasets
-            raw_datasets = dataset_manager.get_raw_datasets()
+            raw_datasets = _list_raw_datasets(dataset_manager.data_dir)
             if raw_datasets:
                 st.info(f"📥 **{len(raw_datasets)} raw datasets** ready for processing")
                 st.markdown("*Process them in Dataset Manager to start generating posts!*")
@@ -248,11 +489,12 @@ def main():
     elif page == "📝 Post History":
         show_post_history()
 
+@fragment
 def show_post_generator():
     st.header("🎯 Generate LinkedIn Posts")
     
     # Check if we have any processed datasets
-    available_datasets = dataset_manager.get_available_datasets()
+    available_datasets = _list_datasets(dataset_manager.data_dir)
     
     if not available_datasets:
         st.markdown("""
@@ -294,6 +536,10 @@ def show_post_generator():
         
         return
     
+    if _few_shot_class() is None:
+        st.warning("⚠️ Few-shot module is not available. Please check your installation.")
+        return
+    
     # Load few shot posts with selected dataset
     try:
         current_dataset = dataset_manager.get_current_dataset()
@@ -302,8 +548,7 @@ def show_post_generator():
             st.warning("⚠️ No dataset selected. Please select a dataset from the sidebar.")
             return
             
-        fs = FewShotPosts(current_dataset)
-        tags = fs.get_tags()
+        tags = _tags_for(current_dataset, _mtime(current_dataset))
         
         if not tags:
             st.warning(f"No tags found in the selected dataset. Please check the dataset: {current_dataset}")
@@ -347,7 +592,7 @@ def show_post_generator():
         
         if st.button("🚀 Generate Post", type="primary"):
             # Check API key first
-            if not check_api_key():
+            if not _api_key_configured():
                 st.error("❌ API key not configured. Please check your .env file.")
                 return
             
@@ -364,11 +609,14 @@ def show_post_generator():
                         "professional": professional_format
                     }
                     
+                    from post_generator import generate_post
+                    
                     post = generate_post(selected_length, selected_language, selected_tag, 
                                        tone=selected_tone, include_hashtags=include_hashtags,
                                        include_emojis=include_emojis, add_cta=add_call_to_action,
                                        professional=professional_format, 
-                                       dataset_path=current_dataset)
+                                       dataset_path=current_dataset,
+                                       fs=get_few_shot(current_dataset))
                     
                     if post:
                         st.markdown(f"""
@@ -382,7 +630,7 @@ def show_post_generator():
                         save_generated_post(post, metadata)
                         
                         # Show related posts used for generation
-                        examples = fs.get_filtered_posts(selected_length, selected_language, selected_tag)
+                        examples = _filtered(current_dataset, _mtime(current_dataset), selected_length, selected_language, selected_tag)
                         if examples:
                             with st.expander(f"📚 Reference Posts Used ({len(examples)} found)"):
                                 for i, example in enumerate(examples[:3]):
@@ -404,7 +652,6 @@ def show_post_generator():
         
         with col1:
             custom_topic = st.text_input("Custom Topic", placeholder="e.g., My first day at Google")
-            custom_topic = sanitize_input(custom_topic, 200)
             target_audience = st.selectbox("Target Audience", 
                                          ["Students", "Professionals", "Entrepreneurs", "Job Seekers", "General"])
             post_purpose = st.selectbox("Post Purpose", 
@@ -418,21 +665,30 @@ def show_post_generator():
         
         additional_context = st.text_area("Additional Context (Optional)", 
                                         placeholder="Any specific details you want to include...")
-        additional_context = sanitize_input(additional_context, 500)
         
         keywords = st.text_input("Keywords to Include", 
                                 placeholder="Separate with commas: coding, internship, learning")
-        keywords = sanitize_input(keywords, 200)
         
         if st.button("🎨 Generate Custom Post", type="primary"):
+            # Sanitize the free-text inputs only when they are about to be used,
+            # not on every rerun of the page
+            custom_topic, additional_context, keywords = (
+                sanitize_input(custom_topic, 200),
+                sanitize_input(additional_context, 500),
+                sanitize_input(keywords, 200),
+            )
+            
             if not custom_topic.strip():
                 st.warning("Please enter a custom topic.")
                 return
                 
-            if not check_api_key():
+            if not _api_key_configured():
                 st.error("❌ API key not configured. Please check your .env file.")
                 return
                 
+            # Split once into clean, non-empty keywords for the prompt
+            keyword_list = [k for k in _KW_SPLIT.split(keywords.strip()) if k] if keywords else []
+            
             with st.spinner("Creating your custom post..."):
                 try:
                     custom_metadata = {
@@ -446,6 +702,8 @@ def show_post_generator():
                         "keywords": keywords
                     }
                     
+                    from post_generator import generate_custom_post
+                    
                     custom_post = generate_custom_post(
                         topic=custom_topic,
                         audience=target_audience,
@@ -454,7 +712,7 @@ def show_post_generator():
                         language=custom_language,
                         style=writing_style,
                         context=additional_context,
-                        keywords=keywords.split(',') if keywords else []
+                        keywords=keyword_list
                     )
                     
                     if custom_post:
@@ -473,11 +731,12 @@ def show_post_generator():
                     error_message = handle_llm_error(e)
                     st.error(error_message)
 
+@fragment
 def show_analytics():
     st.header("📊 Dataset Analytics")
     
     # Check if we have any processed datasets
-    available_datasets = dataset_manager.get_available_datasets()
+    available_datasets = _list_datasets(dataset_manager.data_dir)
     
     if not available_datasets:
         st.markdown("""
@@ -526,6 +785,15 @@ def show_analytics():
         
         return
     
+    try:
+        from analytics import show_analytics_dashboard
+    except ImportError:
+        show_analytics_dashboard = None
+    
+    if _few_shot_class() is None or show_analytics_dashboard is None:
+        st.warning("⚠️ Analytics modules are not available. Please run: pip install -r requirements.txt")
+        return
+    
     try:
         current_dataset = dataset_manager.get_current_dataset()
         
@@ -533,7 +801,7 @@ def show_analytics():
             st.warning("⚠️ No dataset selected. Please select a dataset from the sidebar.")
             return
             
-        fs = FewShotPosts(current_dataset)
+        fs = get_few_shot(current_dataset)
         df = fs.df
         
         if df.empty:
@@ -541,9 +809,9 @@ def show_analytics():
             return
         
         # Show current dataset info
-        st.info(f"📊 Analyzing: **{dataset_manager.get_current_dataset_name()}** ({len(df)} posts)")
+        st.info(f"📊 Analyzing: **{_current_dataset_name()}** ({len(df)} posts)")
         
-        show_analytics_dashboard(df)
+        show_analytics_dashboard(get_analytics_frame(df))
         
     except FileNotFoundError:
         st.error("📁 Selected dataset file not found. Please check if the file exists or select a different dataset.")
@@ -551,6 +819,41 @@ def show_analytics():
         st.error(f"Error loading analytics: {handle_llm_error(e)}")
         st.info("💡 **Tip:** Make sure your dataset is properly processed and contains the required fields.")
 
+@st.cache_data(max_entries=4)
+def _load_templates(path: str, version):
+    """Load saved prompt templates, reparsed when the file's `version` changes"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'rb') as f:
+        return [_loads_json(line) for line in f if line.strip()]
+
+def _save_template():
+    """Append the template from the form inputs to the templates file"""
+    template_name = st.session_state.template_name
+    template_prompt = st.session_state.template_prompt
+    if not (template_name and template_prompt):
+        return
+    
+    new_template = {
+        "name": template_name,
+        "description": st.session_state.template_description,
+        "prompt": template_prompt,
+        "created_at": datetime.now().isoformat()
+    }
+    with open(TEMPLATES_FILE, 'ab') as f:
+        f.write(_dumps_line(new_template))
+    
+    st.session_state['template_saved'] = True
+
+def _delete_template(index):
+    """Remove one template and rewrite the templates file"""
+    templates = _load_templates(TEMPLATES_FILE, _file_version(TEMPLATES_FILE))
+    templates.pop(index)
+    with open(TEMPLATES_FILE, 'wb') as f:
+        for template in templates:
+            f.write(_dumps_line(template))
+
+@fragment
 def show_custom_prompts():
     st.header("⚙️ Custom Prompt Templates")
     
@@ -562,35 +865,20 @@ def show_custom_prompts():
     """, unsafe_allow_html=True)
     
     # Load existing templates
-    templates_file = "data/prompt_templates.json"
-    if os.path.exists(templates_file):
-        with open(templates_file, 'r', encoding='utf-8') as f:
-            templates = json.load(f)
-    else:
-        templates = []
+    _migrate_legacy_json(LEGACY_TEMPLATES_FILE, TEMPLATES_FILE)
+    templates = _load_templates(TEMPLATES_FILE, _file_version(TEMPLATES_FILE))
     
-    # Create new template
+    # Create new template; the button callbacks write the file before the
+    # fragment reruns, so the list below is already up to date
     with st.expander("➕ Create New Template"):
-        template_name = st.text_input("Template Name")
-        template_description = st.text_area("Description")
-        template_prompt = st.text_area("Prompt Template", 
-                                     placeholder="Use variables like {topic}, {length}, {tone}, etc.")
-        
-        if st.button("Save Template"):
-            if template_name and template_prompt:
-                new_template = {
-                    "name": template_name,
-                    "description": template_description,
-                    "prompt": template_prompt,
-                    "created_at": datetime.now().isoformat()
-                }
-                templates.append(new_template)
-                
-                with open(templates_file, 'w', encoding='utf-8') as f:
-                    json.dump(templates, f, indent=2, ensure_ascii=False)
-                
-                st.success("Template saved successfully!")
-                st.rerun()
+        st.text_input("Template Name", key="template_name")
+        st.text_area("Description", key="template_description")
+        st.text_area("Prompt Template", key="template_prompt",
+                     placeholder="Use variables like {topic}, {length}, {tone}, etc.")
+        
+        st.button("Save Template", on_click=_save_template)
+        if st.session_state.pop('template_saved', False):
+            st.success("Template saved successfully!")
     
     # Display existing templates
     st.subheader("📚 Saved Templates")
@@ -598,12 +886,9 @@ def show_custom_prompts():
         with st.expander(f"{template['name']} - {template['description'][:50]}..."):
             st.write(f"**Description:** {template['description']}")
             st.code(template['prompt'])
-            if st.button(f"Delete", key=f"delete_{i}"):
-                templates.pop(i)
-                with open(templates_file, 'w', encoding='utf-8') as f:
-                    json.dump(templates, f, indent=2, ensure_ascii=False)
-                st.rerun()
+            st.button(f"Delete", key=f"delete_{i}", on_click=_delete_template, args=(i,))
 
+@fragment
 def show_dataset_manager():
     st.header("📚 Dataset Management")
     
@@ -621,15 +906,15 @@ def show_dataset_manager():
         
         if uploaded_file is not None:
             try:
-                # Preview the uploaded data
-                uploaded_data = json.load(uploaded_file)
-                uploaded_file.seek(0)  # Reset file pointer
+                # Preview the uploaded data; the file pointer is left at the
+                # start for the processor
+                post_count, preview = _preview_upload(uploaded_file)
                 
-                st.success(f"✅ File loaded successfully! Found {len(uploaded_data)} posts")
+                st.success(f"✅ File loaded successfully! Found {post_count} posts")
                 
                 # Show preview
                 with st.expander("👀 Preview Data"):
-                    st.json(uploaded_data[:2])  # Show first 2 posts
+                    st.json(preview)  # Show first 2 posts
                 
             
 
@@ -667,6 +952,7 @@ def show_dataset_manager():
                                     dataset_name
                                 )
                                 
+                                _clear_dataset_lists()
                                 st.success(f"✅ Dataset processed successfully!")
                                 st.info(f"📁 Processed dataset saved as: {processed_file_path}")
                                 
@@ -690,7 +976,7 @@ def show_dataset_manager():
                             except Exception as e:
                                 st.error(f"❌ Error processing dataset: {e}")
                                 
-            except json.JSONDecodeError:
+            except JSON_ERRORS:
                 st.error("❌ Invalid JSON file. Please check your file format.")
             except Exception as e:
                 st.error(f"❌ Error loading file: {e}")
@@ -699,7 +985,7 @@ def show_dataset_manager():
         st.subheader("🔄 Process Raw Datasets")
         
         # Get raw datasets that need processing
-        raw_datasets = dataset_manager.get_raw_datasets()
+        raw_datasets = _list_raw_datasets(dataset_manager.data_dir)
         
         if raw_datasets:
             st.info("💡 **Raw datasets** only have basic fields (text, engagement). Process them to enable AI features like topic selection and smart generation.")
@@ -737,6 +1023,7 @@ def show_dataset_manager():
                                 processed_name = f"processed_{display_name.lower().replace(' ', '_')}"
                                 processed_path = f"data/{processed_name}.json"
                                 processor.save_processed_dataset(processed_posts, processed_path)
+                                _clear_dataset_lists()
                                 
                                 st.success(f"✅ {display_name} processed successfully!")
                                 st.info(f"📁 Saved as: {processed_name}")
@@ -751,20 +1038,18 @@ def show_dataset_manager():
         st.subheader("🔄 Switch Dataset")
         
         # List available datasets
-        available_datasets = dataset_manager.get_available_datasets()
+        available_datasets = _list_datasets(dataset_manager.data_dir)
         current_dataset = dataset_manager.get_current_dataset()
         
         if available_datasets:
-            current_display_name = None
-            for display_name, file_path in available_datasets.items():
-                if file_path == current_dataset:
-                    current_display_name = display_name
-                    break
+            dataset_names = list(available_datasets)
+            path_to_index = {file_path: i for i, file_path in enumerate(available_datasets.values())}
+            current_index = path_to_index.get(current_dataset, 0)
             
             selected_dataset = st.selectbox(
                 "Select Dataset:",
-                list(available_datasets.keys()),
-                index=list(available_datasets.keys()).index(current_display_name) if current_display_name else 0
+                dataset_names,
+                index=current_index
             )
             
             # Show dataset info
@@ -797,10 +1082,10 @@ def show_dataset_manager():
             return
         
         try:
-            stats = dataset_manager.get_dataset_statistics(current_dataset)
+            stats = get_dataset_stats(current_dataset, _mtime(current_dataset))
             
             if stats:
-                st.success(f"**📊 Analyzing:** {dataset_manager.get_current_dataset_name()}")
+                st.success(f"**📊 Analyzing:** {_current_dataset_name()}")
                 
                 # Overview metrics
                 col1, col2, col3, col4 = st.columns(4)
@@ -857,12 +1142,14 @@ def show_dataset_manager():
                     
                     # Load the dataset for full analytics
                     try:
-                        from few_shot import FewShotPosts
-                        fs = FewShotPosts(current_dataset)
+                        if _few_shot_class() is None:
+                            raise ImportError("few_shot module is not installed")
+                        
+                        fs = get_few_shot(current_dataset)
                         
                         if not fs.df.empty:
                             from analytics import show_analytics_dashboard
-                            show_analytics_dashboard(fs.df)
+                            show_analytics_dashboard(get_analytics_frame(fs.df))
                         else:
                             st.warning("Dataset appears to be empty for full analytics.")
                     except Exception as analytics_error:
@@ -875,42 +1162,53 @@ def show_dataset_manager():
         except Exception as e:
             st.error(f"Error loading statistics: {e}")
 
+def show_history_entries(history):
+    """Filter and list history entries; runs inside the show_post_history fragment,
+    so filter changes rerun that fragment and reload the latest history"""
+    import pandas as pd
+    
+    # Filter options
+    col1, col2 = st.columns(2)
+    with col1:
+        filter_language = st.selectbox("Filter by Language", 
+                                     ("All",) + language_options)
+    with col2:
+        filter_length = st.selectbox("Filter by Length", 
+                                   ("All",) + length_options)
+    
+    # Display history
+    mask = pd.Series(True, index=history.index)
+    if filter_language != "All":
+        mask &= history['metadata.language'] == filter_language
+    if filter_length != "All":
+        mask &= history['metadata.length'] == filter_length
+    filtered_history = history[mask]
+    
+    shown = filtered_history.tail(20).iloc[::-1]  # Show last 20
+    base = len(filtered_history)
+    for offset, entry in enumerate(shown.to_dict(orient='records')):
+        metadata = {
+            key.split('.', 1)[1]: value for key, value in entry.items()
+            if key.startswith('metadata.') and pd.notna(value)
+        }
+        with st.expander(f"Post {base - offset} - {entry['created']}"):
+            st.write(entry['content'])
+            if metadata:
+                st.json(metadata)
+
+@fragment
 def show_post_history():
     st.header("📝 Generated Posts History")
     
-    history_file = "data/generated_posts_history.json"
+    _migrate_legacy_history()
     
-    if os.path.exists(history_file):
-        with open(history_file, 'r', encoding='utf-8') as f:
-            history = json.load(f)
+    if os.path.exists(HISTORY_FILE):
+        history = _load_history(HISTORY_FILE, _file_version(HISTORY_FILE))
         
-        if history:
+        if not history.empty:
             st.write(f"📊 Total posts generated: {len(history)}")
             
-            # Filter options
-            col1, col2 = st.columns(2)
-            with col1:
-                filter_language = st.selectbox("Filter by Language", 
-                                             ["All"] + language_options)
-            with col2:
-                filter_length = st.selectbox("Filter by Length", 
-                                           ["All"] + length_options)
-            
-            # Display history
-            filtered_history = history
-            if filter_language != "All":
-                filtered_history = [h for h in filtered_history 
-                                  if h.get('metadata', {}).get('language') == filter_language]
-            if filter_length != "All":
-                filtered_history = [h for h in filtered_history 
-                                  if h.get('metadata', {}).get('length') == filter_length]
-            
-            for i, entry in enumerate(reversed(filtered_history[-20:])):  # Show last 20
-                timestamp = datetime.fromisoformat(entry['timestamp']).strftime("%Y-%m-%d %H:%M")
-                with st.expander(f"Post {len(filtered_history)-i} - {timestamp}"):
-                    st.write(entry['content'])
-                    if 'metadata' in entry:
-                        st.json(entry['metadata'])
+            show_history_entries(history)
         else:
             st.info("No posts generated yet. Start creating some posts!")
     else:
@@ -1,3 +1,11 @@
+import asyncio
+import functools
+import hashlib
+import os
+import string
+import threading
+import time
+import types
 from llm_helper import llm
 from few_shot import FewShotPosts
 from error_handler import validate_llm_response, LLMError
@@ -6,42 +14,123 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-# Initialize with default, but allow override
-few_shot = None
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
 
-def get_few_shot_instance(dataset_path=None):
-    """Get FewShotPosts instance with optional dataset override"""
-    global few_shot
-    if dataset_path:
-        return FewShotPosts(dataset_path)
-    if few_shot is None:
-        few_shot = FewShotPosts()
-    return few_shot
+DEFAULT_DATASET_PATH = "data/processed_posts.json"
+
+# One FewShotPosts per dataset path, reloaded only when the file changes
+_FS_CACHE = {}
+_FS_CACHE_LOCK = threading.Lock()
 
+def get_few_shot_instance(dataset_path=None):
+    """Get the cached FewShotPosts instance for a dataset (default dataset if None)"""
+    path = dataset_path or DEFAULT_DATASET_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+
+    with _FS_CACHE_LOCK:
+        cached = _FS_CACHE.get(path)
+    if cached is None or cached[0] != mtime:
+        # Load outside the lock so different datasets can load in parallel
+        cached = (mtime, FewShotPosts(path))
+        with _FS_CACHE_LOCK:
+            _FS_CACHE[path] = cached
+    return cached[1]
+
+
+# Line-count description per length, flattened once from the config and
+# read-only so every prompt sees the same strings
+_LENGTH_STR = types.MappingProxyType({
+    length: definition.get("lines", "1 to 5 lines")
+    for length, definition in LENGTH_DEFINITIONS.items()
+})
 
 def get_length_str(length):
     """Get length description from config"""
-    length_config = LENGTH_DEFINITIONS.get(length, {})
-    return length_config.get("lines", "1 to 5 lines")
+    return _LENGTH_STR.get(length, "1 to 5 lines")
+
+
+def _response_content(response):
+    """Validate an LLM response and return its text"""
+    if response and hasattr(response, 'content'):
+        content = response.content
+        validate_llm_response(content)
+        return content
+    raise LLMError("Empty response from LLM")
+
+
+_response_cache = None
+
+def _get_response_cache():
+    """Prompt-hash -> post text cache, or None when response caching is disabled"""
+    global _response_cache
+    performance = get_config("performance")
+    if _response_cache is None and performance.get("response_cache"):
+        if DISKCACHE_AVAILABLE:
+            _response_cache = diskcache.Cache(performance["response_cache_dir"])
+        else:
+            _response_cache = {}
+    return _response_cache
+
+
+def _cache_store(cache, key, content):
+    cache[key] = content
+    # The in-memory fallback keeps only the newest `cache_size` posts
+    if isinstance(cache, dict) and len(cache) > get_config("performance")["cache_size"]:
+        cache.pop(next(iter(cache)))
+
+
+def _prompt_key(prompt):
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _invoke(prompt):
+    """Invoke the LLM, serving repeated prompts from the response cache when enabled"""
+    cache = _get_response_cache()
+    if cache is None:
+        return _response_content(llm.invoke(prompt))
+
+    key = _prompt_key(prompt)
+    content = cache.get(key)
+    if content is None:
+        content = _response_content(llm.invoke(prompt))
+        _cache_store(cache, key, content)
+    return content
+
+
+async def _ainvoke(prompt):
+    """Async counterpart of _invoke"""
+    cache = _get_response_cache()
+    if cache is None:
+        return _response_content(await llm.ainvoke(prompt))
+
+    key = _prompt_key(prompt)
+    content = cache.get(key)
+    if content is None:
+        content = _response_content(await llm.ainvoke(prompt))
+        _cache_store(cache, key, content)
+    return content
 
 
 def generate_post(length, language, tag, tone="Professional", include_hashtags=True, 
-                 include_emojis=True, add_cta=False, professional=False, dataset_path=None):
-    """Generate a post with error handling"""
+                 include_emojis=True, add_cta=False, professional=False, dataset_path=None,
+                 fs=None):
+    """Generate a post with error handling; pass `fs` to reuse an already loaded dataset"""
     try:
-        fs = get_few_shot_instance(dataset_path)
+        if fs is None:
+            fs = get_few_shot_instance(dataset_path)
         prompt = get_prompt(length, language, tag, tone, include_hashtags, 
                            include_emojis, add_cta, professional, fs)
         
-        response = llm.invoke(prompt)
-        
-        if response and hasattr(response, 'content'):
-            content = response.content
-            validate_llm_response(content)
-            logger.info("Post generated successfully")
-            return content
-        else:
-            raise LLMError("Empty response from LLM")
+        content = _invoke(prompt)
+        logger.info("Post generated successfully")
+        return content
             
     except Exception as e:
         logger.error(f"Error generating post: {e}")
@@ -57,92 +146,117 @@ def generate_custom_post(topic, audience, purpose, length, language, style,
         
         prompt = get_custom_prompt(topic, audience, purpose, length, language, 
                                   style, context, keywords)
-        response = llm.invoke(prompt)
-        
-        if response and hasattr(response, 'content'):
-            content = response.content
-            validate_llm_response(content)
-            logger.info("Custom post generated successfully")
-            return content
-        else:
-            raise LLMError("Empty response from LLM")
+        content = _invoke(prompt)
+        logger.info("Custom post generated successfully")
+        return content
             
     except Exception as e:
         logger.error(f"Error generating custom post: {e}")
         raise
 
 
-def get_prompt(length, language, tag, tone="Professional", include_hashtags=True, 
-               include_emojis=True, add_cta=False, professional=False, fs=None):
-    if fs is None:
-        fs = get_few_shot_instance()
-        
-    length_str = get_length_str(length)
-
-    prompt = f'''
-    Generate a LinkedIn post using the below information. No preamble.
-
-    1) Topic: {tag}
-    2) Length: {length_str}
-    3) Language: {language}
-    4) Tone: {tone}
-    5) Include Hashtags: {include_hashtags}
-    6) Include Emojis: {include_emojis}
-    7) Add Call-to-Action: {add_cta}
-    8) Professional Format: {professional}
-    
+class _RateLimiter:
+    """Token bucket allowing `rate` requests per second"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        # The bucket must hold at least one token, or rates below 1/s never refill enough
+        self.capacity = max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+async def _ainvoke_one(prompt, semaphore, limiter):
+    async with semaphore:
+        if limiter:
+            await limiter.acquire()
+        return await _ainvoke(prompt)
+
+
+async def agenerate_from_prompts(prompts, max_concurrency=10, rate_limit=None):
+    """Send prompts concurrently with at most `max_concurrency` in flight and
+    at most `rate_limit` requests per second (None for no limit)"""
+    # Results stay aligned with prompts; a failed request leaves its exception
+    # in place of the text so one error doesn't discard the whole batch
+    semaphore = asyncio.Semaphore(max_concurrency)
+    limiter = _RateLimiter(rate_limit) if rate_limit else None
+    results = await asyncio.gather(
+        *(_ainvoke_one(prompt, semaphore, limiter) for prompt in prompts),
+        return_exceptions=True
+    )
+    failed = sum(isinstance(result, Exception) for result in results)
+    if failed:
+        logger.error(f"{failed} of {len(results)} batch generations failed")
+    logger.info(f"Batch generated {len(results) - failed} posts")
+    return results
+
+
+async def agenerate_posts_batch(specs, max_concurrency=10, dataset_path=None):
+    """Generate one post per spec (get_prompt keyword arguments) concurrently from one dataset"""
+    fs = get_few_shot_instance(dataset_path)
+    prompts = [get_prompt(fs=fs, **spec) for spec in specs]
+    return await agenerate_from_prompts(prompts, max_concurrency)
+
+
+async def agenerate_custom_posts_batch(specs, max_concurrency=10):
+    """Generate one custom post per spec (generate_custom_post keyword arguments) concurrently"""
+    prompts = [
+        get_custom_prompt(**{"context": "", "keywords": [], **spec})
+        for spec in specs
+    ]
+    return await agenerate_from_prompts(prompts, max_concurrency)
+
+
+def generate_posts_batch(specs, max_concurrency=10, dataset_path=None):
+    """Blocking wrapper around agenerate_posts_batch"""
+    return asyncio.run(agenerate_posts_batch(specs, max_concurrency, dataset_path))
+
+
+def generate_custom_posts_batch(specs, max_concurrency=10):
+    """Blocking wrapper around agenerate_custom_posts_batch"""
+    return asyncio.run(agenerate_custom_posts_batch(specs, max_concurrency))
+
+
+# The instructions shared by every call come first and verbatim, so providers
+# that cache prompt prefixes can reuse them; per-call fields follow
+POST_PROMPT_PREFIX = '''
+    Generate a LinkedIn post using the information at the end. No preamble.
+
     If Language is Hinglish then it means it is a mix of Hindi and English. 
     The script for the generated post should always be English.
-    
-    Additional Guidelines:
-    - If tone is "Humorous", include light jokes or witty observations
-    - If tone is "Inspirational", focus on motivation and positive messaging
-    - If tone is "Educational", provide valuable insights or tips
-    - If tone is "Casual", use conversational language and personal anecdotes
-    - If include_hashtags is True, add 3-5 relevant hashtags at the end
-    - If include_emojis is True, use appropriate emojis throughout the post
-    - If add_cta is True, include a call-to-action like "What's your experience?" or "Share your thoughts"
-    - If professional is True, maintain formal business language
     '''
 
-    examples = fs.get_filtered_posts(length, language, tag)
+# Conditional guidelines; a compiled post template keeps only the lines that
+# apply to its tone and flags
+_TONE_GUIDELINES = {
+    "Humorous": '- If tone is "Humorous", include light jokes or witty observations',
+    "Inspirational": '- If tone is "Inspirational", focus on motivation and positive messaging',
+    "Educational": '- If tone is "Educational", provide valuable insights or tips',
+    "Casual": '- If tone is "Casual", use conversational language and personal anecdotes'
+}
+
+_FLAG_GUIDELINES = (
+    ("include_hashtags", "- If include_hashtags is True, add 3-5 relevant hashtags at the end"),
+    ("include_emojis", "- If include_emojis is True, use appropriate emojis throughout the post"),
+    ("add_cta", '- If add_cta is True, include a call-to-action like "What\'s your experience?" or "Share your thoughts"'),
+    ("professional", "- If professional is True, maintain formal business language")
+)
+
+CUSTOM_PROMPT_PREFIX = '''
+    Generate a LinkedIn post with the specifications at the end. No preamble.
 
-    if len(examples) > 0:
-        prompt += "\n\n9) Use the writing style as per the following examples:"
-
-    for i, post in enumerate(examples):
-        post_text = post['text']
-        prompt += f'\n\n Example {i+1}: \n\n {post_text}'
-
-        if i == 1:  # Use max two samples
-            break
-
-    return prompt
-
-
-def get_custom_prompt(topic, audience, purpose, length, language, style, context, keywords):
-    """Generate a custom prompt for specific requirements"""
-    length_str = get_length_str(length)
-    keywords_str = ", ".join(keywords) if keywords else "None specified"
-    
-    prompt = f'''
-    Generate a LinkedIn post with the following specifications. No preamble.
-
-    CONTENT SPECIFICATIONS:
-    1) Topic: {topic}
-    2) Target Audience: {audience}
-    3) Post Purpose: {purpose}
-    4) Length: {length_str}
-    5) Language: {language}
-    6) Writing Style: {style}
-    7) Additional Context: {context}
-    8) Keywords to Include: {keywords_str}
-
-    STYLE GUIDELINES:
-    - {get_style_guidelines(style)}
-    - {get_audience_guidelines(audience)}
-    - {get_purpose_guidelines(purpose)}
-    
     FORMATTING:
     - Use appropriate emojis for engagement
     - Include relevant hashtags
@@ -151,60 +265,46 @@ def get_custom_prompt(topic, audience, purpose, length, language, style, context
     
     Make the post relatable, engaging, and valuable for the target audience.
     '''
-    
-    return prompt
-
-
-def get_style_guidelines(style):
-    """Get specific guidelines for writing styles"""
-    guidelines = {
-        "Storytelling": "Structure as a narrative with beginning, middle, and end. Use personal anecdotes.",
-        "List Format": "Present information in numbered points or bullet format for easy readability.",
-        "Question-Answer": "Start with a compelling question and provide thoughtful answers.",
-        "Tips & Tricks": "Focus on actionable advice and practical insights.",
-        "Personal Reflection": "Share personal experiences, lessons learned, and honest insights."
-    }
-    return guidelines.get(style, "Write in an engaging and authentic manner.")
 
+# Per-call parts, compiled once instead of rebuilding an f-string per call
+_POST_FIELDS = string.Template('''
+    1) Topic: $tag
+    2) Length: $length_str
+    3) Language: $language
+    4) Tone: $tone
+    5) Include Hashtags: $include_hashtags
+    6) Include Emojis: $include_emojis
+    7) Add Call-to-Action: $add_cta
+    8) Professional Format: $professional
+    ''')
+
+_CUSTOM_FIELDS = string.Template('''
+    CONTENT SPECIFICATIONS:
+    1) Topic: $topic
+    2) Target Audience: $audience
+    3) Post Purpose: $purpose
+    4) Length: $length_str
+    5) Language: $language
+    6) Writing Style: $style
+    7) Additional Context: $context
+    8) Keywords to Include: $keywords_str
 
-def get_audience_guidelines(audience):
-    """Get specific guidelines for target audiences"""
-    guidelines = {
-        "Students": "Use relatable college/university experiences, learning journey, academic challenges.",
-        "Professionals": "Focus on career growth, workplace insights, professional development.",
-        "Entrepreneurs": "Emphasize business insights, startup journey, leadership lessons.",
-        "Job Seekers": "Address job search challenges, interview tips, career transition advice.",
-        "General": "Keep content broadly relatable and universally valuable."
-    }
-    return guidelines.get(audience, "Keep content relevant and valuable.")
-
-
-def get_purpose_guidelines(purpose):
-    """Get specific guidelines for post purposes"""
-    guidelines = {
-        "Share Experience": "Be authentic and share genuine personal experiences with lessons learned.",
-        "Give Advice": "Provide actionable tips and insights based on experience.",
-        "Ask Question": "Engage audience with thought-provoking questions that encourage interaction.",
-        "Celebrate Achievement": "Share accomplishments while remaining humble and inspiring others.",
-        "Educational": "Focus on teaching something valuable with clear, actionable information."
-    }
-    return guidelines.get(purpose, "Create valuable and engaging content.")
-
+    STYLE GUIDELINES:
+    - $style_guidelines
+    - $audience_guidelines
+    - $purpose_guidelines
+    ''')
 
-def generate_college_student_post(year, event_type, subject="Computer Science", 
-                                 emotion="excited", length="Medium", language="English"):
-    """Generate posts specifically for college students"""
-    
-    prompt = f'''
-    Generate a LinkedIn post from the perspective of a {year} year Computer Science Engineering student.
+_COLLEGE_TEMPLATE = string.Template('''
+    Generate a LinkedIn post from the perspective of a $year year Computer Science Engineering student.
     
     CONTEXT:
-    - Student Year: {year}
-    - Event/Experience: {event_type}
-    - Subject: {subject}
-    - Emotional Tone: {emotion}
-    - Length: {get_length_str(length)}
-    - Language: {language}
+    - Student Year: $year
+    - Event/Experience: $event_type
+    - Subject: $subject
+    - Emotional Tone: $emotion
+    - Length: $length_str
+    - Language: $language
     
     REQUIREMENTS:
     - Write from a genuine student perspective
@@ -221,7 +321,111 @@ def generate_college_student_post(year, event_type, subject="Computer Science",
     - Campus fest, technical presentation, open source contribution
     
     Make the post authentic and inspiring for fellow students.
-    '''
+    ''')
+
+_EXAMPLES_HEADER = "\n\n9) Use the writing style as per the following examples:"
+
+
+@functools.lru_cache(maxsize=64, typed=True)
+def _compiled_post_template(tone, include_hashtags, include_emojis, add_cta, professional):
+    """Post prompt template specialized for one tone and flag combination"""
+    flags = {"include_hashtags": include_hashtags, "include_emojis": include_emojis,
+             "add_cta": add_cta, "professional": professional}
+    guidelines = [_TONE_GUIDELINES[tone]] if tone in _TONE_GUIDELINES else []
+    guidelines += [line for flag, line in _FLAG_GUIDELINES if flags[flag]]
+
+    prefix = POST_PROMPT_PREFIX
+    if guidelines:
+        prefix += "\n    Additional Guidelines:\n" + "".join(f"    {line}\n" for line in guidelines) + "    "
+
+    # Bake the fixed fields in now; `$` in the tone must survive the second pass
+    fields = _POST_FIELDS.safe_substitute(
+        tone=str(tone).replace("$", "$$"), include_hashtags=include_hashtags,
+        include_emojis=include_emojis, add_cta=add_cta, professional=professional
+    )
+    return string.Template(prefix + fields)
+
+
+def get_prompt(length, language, tag, tone="Professional", include_hashtags=True, 
+               include_emojis=True, add_cta=False, professional=False, fs=None):
+    if fs is None:
+        fs = get_few_shot_instance()
+        
+    prompt = _compiled_post_template(
+        tone, include_hashtags, include_emojis, add_cta, professional
+    ).substitute(tag=tag, length_str=get_length_str(length), language=language)
+
+    examples = fs.get_filtered_posts(length, language, tag, limit=2)  # Use max two samples
+    if not examples:
+        return prompt
+
+    return "".join([
+        prompt, _EXAMPLES_HEADER,
+        *(f'\n\n Example {i}: \n\n {post["text"]}' for i, post in enumerate(examples, 1))
+    ])
+
+
+def get_custom_prompt(topic, audience, purpose, length, language, style, context, keywords):
+    """Generate a custom prompt for specific requirements"""
+    return CUSTOM_PROMPT_PREFIX + _CUSTOM_FIELDS.substitute(
+        topic=topic, audience=audience, purpose=purpose,
+        length_str=get_length_str(length), language=language, style=style,
+        context=context,
+        keywords_str=", ".join(keywords) if keywords else "None specified",
+        style_guidelines=get_style_guidelines(style),
+        audience_guidelines=get_audience_guidelines(audience),
+        purpose_guidelines=get_purpose_guidelines(purpose)
+    )
+
+
+STYLE_GUIDELINES = {
+    "Storytelling": "Structure as a narrative with beginning, middle, and end. Use personal anecdotes.",
+    "List Format": "Present information in numbered points or bullet format for easy readability.",
+    "Question-Answer": "Start with a compelling question and provide thoughtful answers.",
+    "Tips & Tricks": "Focus on actionable advice and practical insights.",
+    "Personal Reflection": "Share personal experiences, lessons learned, and honest insights."
+}
+
+AUDIENCE_GUIDELINES = {
+    "Students": "Use relatable college/university experiences, learning journey, academic challenges.",
+    "Professionals": "Focus on career growth, workplace insights, professional development.",
+    "Entrepreneurs": "Emphasize business insights, startup journey, leadership lessons.",
+    "Job Seekers": "Address job search challenges, interview tips, career transition advice.",
+    "General": "Keep content broadly relatable and universally valuable."
+}
+
+PURPOSE_GUIDELINES = {
+    "Share Experience": "Be authentic and share genuine personal experiences with lessons learned.",
+    "Give Advice": "Provide actionable tips and insights based on experience.",
+    "Ask Question": "Engage audience with thought-provoking questions that encourage interaction.",
+    "Celebrate Achievement": "Share accomplishments while remaining humble and inspiring others.",
+    "Educational": "Focus on teaching something valuable with clear, actionable information."
+}
+
+
+def get_style_guidelines(style):
+    """Get specific guidelines for writing styles"""
+    return STYLE_GUIDELINES.get(style, "Write in an engaging and authentic manner.")
+
+
+def get_audience_guidelines(audience):
+    """Get specific guidelines for target audiences"""
+    return AUDIENCE_GUIDELINES.get(audience, "Keep content relevant and valuable.")
+
+
+def get_purpose_guidelines(purpose):
+    """Get specific guidelines for post purposes"""
+    return PURPOSE_GUIDELINES.get(purpose, "Create valuable and engaging content.")
+
+
+def generate_college_student_post(year, event_type, subject="Computer Science", 
+                                 emotion="excited", length="Medium", language="English"):
+    """Generate posts specifically for college students"""
+    
+    prompt = _COLLEGE_TEMPLATE.substitute(
+        year=year, event_type=event_type, subject=subject, emotion=emotion,
+        length_str=get_length_str(length), language=language
+    )
     
     response = llm.invoke(prompt)
     return response.content
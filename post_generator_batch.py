@@ -0,0 +1,129 @@
+"""
+Bulk post generation for offline runs (dataset seeding, regenerating many posts)
+Submits prompts through the Groq batch API when asked, otherwise sends them
+concurrently with a concurrency cap and a requests-per-second limit
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+
+from llm_helper import llm
+from error_handler import validate_llm_response, LLMError
+from post_generator import (
+    get_prompt, get_custom_prompt, get_few_shot_instance, agenerate_from_prompts
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    from groq import Groq
+    GROQ_SDK_AVAILABLE = True
+except ImportError:
+    GROQ_SDK_AVAILABLE = False
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+FINAL_BATCH_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchPostGenerator:
+    def __init__(self, provider="groq", max_concurrency=10, rate_limit=None,
+                 use_batch_api=False, poll_interval=5, max_poll_interval=300):
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self.rate_limit = rate_limit  # requests per second, None for no limit
+        self.use_batch_api = use_batch_api
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+
+    def generate_posts(self, specs, dataset_path=None):
+        """Generate one post per spec (get_prompt keyword arguments) from one dataset"""
+        fs = get_few_shot_instance(dataset_path)
+        return self.generate([get_prompt(fs=fs, **spec) for spec in specs])
+
+    def generate_custom_posts(self, specs):
+        """Generate one custom post per spec (get_custom_prompt keyword arguments)"""
+        prompts = [
+            get_custom_prompt(**{"context": "", "keywords": [], **spec})
+            for spec in specs
+        ]
+        return self.generate(prompts)
+
+    def generate(self, prompts):
+        """Return results aligned with `prompts`; a failed item holds its exception"""
+        if self.use_batch_api:
+            if self._batch_api_supported():
+                return self._generate_with_batch_api(prompts)
+            logger.warning(f"No batch API available for provider '{self.provider}', "
+                           "sending requests concurrently instead")
+        return asyncio.run(
+            agenerate_from_prompts(prompts, self.max_concurrency, self.rate_limit)
+        )
+
+    def _batch_api_supported(self):
+        return self.provider == "groq" and GROQ_SDK_AVAILABLE
+
+    def _generate_with_batch_api(self, prompts):
+        """Upload all prompts as one JSONL batch, wait for it, and map outputs back"""
+        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        model = getattr(llm, "model_name", None)
+
+        lines = [
+            json.dumps({
+                "custom_id": f"post-{i}",
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {"model": model, "messages": [{"role": "user", "content": prompt}]}
+            }, ensure_ascii=False)
+            for i, prompt in enumerate(prompts)
+        ]
+        input_file = client.files.create(
+            file=("post_batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h"
+        )
+        logger.info(f"Submitted batch {batch.id} with {len(prompts)} prompts")
+
+        # Poll with exponential backoff until the batch reaches a final state
+        delay = self.poll_interval
+        while batch.status not in FINAL_BATCH_STATES:
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_poll_interval)
+            batch = client.batches.retrieve(batch.id)
+
+        # One exception per slot, so callers can't mistake slots for each other
+        results = [
+            LLMError(f"No result for post-{i} in batch {batch.id} (status '{batch.status}')")
+            for i in range(len(prompts))
+        ]
+        if batch.output_file_id:
+            output = client.files.content(batch.output_file_id).text()
+            for line in output.splitlines():
+                if line.strip():
+                    index, result = self._parse_batch_line(json.loads(line))
+                    if 0 <= index < len(results):
+                        results[index] = result
+
+        failed = sum(isinstance(result, Exception) for result in results)
+        logger.info(f"Batch {batch.id}: {len(results) - failed} posts generated, {failed} failed")
+        return results
+
+    def _parse_batch_line(self, record):
+        """(prompt index, post text or exception) for one line of batch output"""
+        custom_id = record.get("custom_id", "")
+        index = int(custom_id[len("post-"):]) if custom_id.startswith("post-") else -1
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            return index, LLMError(f"Batch request {custom_id} failed: {record.get('error') or response}")
+
+        try:
+            content = response["body"]["choices"][0]["message"]["content"]
+            validate_llm_response(content)
+        except Exception as e:
+            return index, e
+        return index, content
@@ -2,9 +2,21 @@
 Quick start script for LinkedIn Post Generator by Vacant Vectors
 """
 import os
+import shutil
 import subprocess
 import sys
 
+# Parsed .env values, keyed by the file's mtime so repeat checks skip the read
+_env_cache = {'mtime': None, 'vars': None}
+
+def load_env_values(path='.env'):
+    """Return the parsed .env values, re-reading the file only when it changed"""
+    mtime = os.stat(path).st_mtime_ns
+    if mtime != _env_cache['mtime']:
+        from dotenv import dotenv_values
+        _env_cache['mtime'], _env_cache['vars'] = mtime, dotenv_values(path)
+    return _env_cache['vars']
+
 def check_python_version():
     """Check if Python version is compatible"""
     if sys.version_info < (3, 8):
@@ -13,8 +25,37 @@ def check_python_version():
     print(f"✅ Python version: {sys.version}")
     return True
 
+def requirements_satisfied(path="requirements.txt"):
+    """Check if every requirement is already installed at a matching version"""
+    from importlib.metadata import version, PackageNotFoundError
+    try:
+        from packaging.requirements import Requirement
+    except ImportError:
+        # Can't compare versions, so let pip decide
+        return False
+    
+    with open(path, 'r') as f:
+        lines = [line.split('#', 1)[0].strip() for line in f]
+    
+    for line in filter(None, lines):
+        requirement = Requirement(line)
+        try:
+            installed = version(requirement.name)
+        except PackageNotFoundError:
+            return False
+        if not requirement.specifier.contains(installed, prereleases=True):
+            return False
+    return True
+
 def install_requirements():
     """Install required packages"""
+    try:
+        if requirements_satisfied():
+            print("✅ Requirements already installed")
+            return True
+    except Exception:
+        pass  # Fall back to pip on an unreadable or unparsable requirements file
+    
     print("📦 Installing requirements...")
     try:
         subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], 
@@ -27,31 +68,33 @@ def install_requirements():
 
 def check_env_file():
     """Check if .env file exists"""
-    if not os.path.exists('.env'):
+    try:
+        env_values = load_env_values()
+    except FileNotFoundError:
+        env_values = None
+    
+    if env_values is None:
         print("⚠️ .env file not found!")
         print("📝 Creating .env file from template...")
         
-        if os.path.exists('.env.example'):
+        try:
             # Copy .env.example to .env
-            with open('.env.example', 'r') as src:
-                with open('.env', 'w') as dst:
-                    dst.write(src.read())
-            print("✅ .env file created!")
-            print("🔑 Please edit .env and add your GROQ_API_KEY")
-            print("   Get your key from: https://console.groq.com/keys")
-            return False
-        else:
+            shutil.copyfile('.env.example', '.env')
+        except FileNotFoundError:
             print("❌ .env.example not found!")
             return False
+        print("✅ .env file created!")
+        print("🔑 Please edit .env and add your GROQ_API_KEY")
+        print("   Get your key from: https://console.groq.com/keys")
+        return False
     else:
         print("✅ .env file found")
         
         # Check if API key is set
-        with open('.env', 'r') as f:
-            content = f.read()
-            if 'your_groq_api_key_here' in content or 'GROQ_API_KEY=' not in content:
-                print("⚠️ Please add your GROQ_API_KEY to the .env file")
-                return False
+        api_key = env_values.get('GROQ_API_KEY')
+        if not api_key or api_key == 'your_groq_api_key_here':
+            print("⚠️ Please add your GROQ_API_KEY to the .env file")
+            return False
         print("✅ API key appears to be configured")
         return True
 
@@ -6,8 +6,22 @@ import os
 import sys
 import json
 import logging
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
 def setup_logging():
     """Setup logging configuration"""
     log_dir = Path("data")
@@ -63,25 +77,82 @@ def setup_directories():
         Path(directory).mkdir(parents=True, exist_ok=True)
         logger.info(f"Directory created/verified: {directory}")
 
+def _load_json_file(file_path):
+    """Parse a JSON file, using orjson when it is installed"""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _dumps_json(obj, indent=False):
+    """Serialize to UTF-8 encoded JSON, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
 def setup_data_files():
     """Initialize necessary data files"""
     logger = logging.getLogger(__name__)
     
     files_to_create = {
-        "data/generated_posts_history.json": [],
-        "data/prompt_templates.json": [],
+        "data/generated_posts_history.jsonl": None,
+        "data/prompt_templates.jsonl": None,
         "data/analytics_cache.json": {}
     }
     
     for file_path, default_content in files_to_create.items():
         if not os.path.exists(file_path):
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(default_content, f, indent=2)
+                if file_path.endswith('.jsonl'):
+                    # Line-delimited files start out empty
+                    open(file_path, 'a', encoding='utf-8').close()
+                else:
+                    with open(file_path, 'wb') as f:
+                        f.write(_dumps_json(default_content, indent=True))
                 logger.info(f"Created data file: {file_path}")
             except Exception as e:
                 logger.error(f"Failed to create {file_path}: {e}")
 
+# ijson events that begin a value: a post object, a nested array or a scalar
+_ITEM_START_EVENTS = frozenset(('start_map', 'start_array', 'string', 'number', 'boolean', 'null'))
+
+def _count_dataset_posts(dataset):
+    """Number of posts in a dataset file, or None if it does not hold a list"""
+    if not IJSON_AVAILABLE:
+        data = _load_json_file(dataset)
+        return len(data) if isinstance(data, list) else None
+
+    # Stream the parse events so the dataset is never held in memory; each
+    # top-level item opens with exactly one of these events at prefix 'item',
+    # and anything nested inside a post has a longer prefix
+    with open(dataset, 'rb') as f:
+        events = ijson.parse(f)
+        if next(events, (None, None, None))[1] != 'start_array':
+            return None
+        return sum(1 for prefix, event, _ in events
+                   if prefix == 'item' and event in _ITEM_START_EVENTS)
+
+def _read_validation_sidecar(dataset):
+    """Post count recorded by the last validation, or None if the dataset changed since"""
+    try:
+        stat = os.stat(dataset)
+        meta = _load_json_file(dataset + '.valid')
+    except (OSError, ValueError):
+        return None
+    if meta.get('mtime_ns') != stat.st_mtime_ns or meta.get('size') != stat.st_size:
+        return None
+    return meta.get('posts')
+
+def _write_validation_sidecar(dataset, post_count):
+    """Record that the dataset, as it is now on disk, passed validation"""
+    try:
+        stat = os.stat(dataset)
+        with open(dataset + '.valid', 'wb') as f:
+            f.write(_dumps_json({'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'posts': post_count}))
+    except OSError as e:
+        logging.getLogger(__name__).warning(f"Could not write validation sidecar for {dataset}: {e}")
+
 def validate_datasets():
     """Validate that required datasets exist"""
     logger = logging.getLogger(__name__)
@@ -103,37 +174,41 @@ def validate_datasets():
     # Validate dataset format
     for dataset in required_datasets:
         try:
-            with open(dataset, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if not isinstance(data, list):
-                    logger.error(f"Invalid dataset format: {dataset}")
-                    return False
-                logger.info(f"Dataset validated: {dataset} ({len(data)} posts)")
+            # Unchanged since the last successful validation, skip the parse
+            post_count = _read_validation_sidecar(dataset)
+            if post_count is not None:
+                logger.info(f"Dataset unchanged since last validation: {dataset} ({post_count} posts)")
+                continue
+            
+            post_count = _count_dataset_posts(dataset)
+            if post_count is None:
+                logger.error(f"Invalid dataset format: {dataset}")
+                return False
+            _write_validation_sidecar(dataset, post_count)
+            logger.info(f"Dataset validated: {dataset} ({post_count} posts)")
         except Exception as e:
             logger.error(f"Error validating dataset {dataset}: {e}")
             return False
     
     return True
 
+# (pip package, top-level module it installs)
+REQUIRED_PACKAGES = (
+    ('streamlit', 'streamlit'),
+    ('langchain', 'langchain'),
+    ('langchain_groq', 'langchain_groq'),
+    ('pandas', 'pandas'),
+    ('python-dotenv', 'dotenv'),
+    ('plotly', 'plotly')
+)
+
 def check_dependencies():
     """Check if all required packages are installed"""
     logger = logging.getLogger(__name__)
     
-    required_packages = [
-        'streamlit',
-        'langchain',
-        'langchain_groq',
-        'pandas',
-        'python-dotenv',
-        'plotly'
-    ]
-    
-    missing_packages = []
-    for package in required_packages:
-        try:
-            __import__(package.replace('-', '_'))
-        except ImportError:
-            missing_packages.append(package)
+    # find_spec only locates the module, it doesn't run the (slow) import
+    missing_packages = [package for package, module in REQUIRED_PACKAGES
+                        if importlib.util.find_spec(module) is None]
     
     if missing_packages:
         logger.error(f"Missing required packages: {missing_packages}")
@@ -148,25 +223,35 @@ def startup_checks():
     logger = setup_logging()
     logger.info("Starting LinkedIn Post Generator...")
     
-    checks = [
-        ("Dependencies", check_dependencies),
-        ("Environment", check_environment),
-        ("Directories", lambda: (setup_directories(), True)[1]),
-        ("Data Files", lambda: (setup_data_files(), True)[1]),
-        ("Datasets", validate_datasets)
+    # Checks within a wave are independent and run concurrently; the data
+    # directories must exist before data files are created or datasets read
+    waves = [
+        [
+            ("Dependencies", check_dependencies),
+            ("Environment", check_environment),
+            ("Directories", lambda: (setup_directories(), True)[1]),
+        ],
+        [
+            ("Data Files", lambda: (setup_data_files(), True)[1]),
+            ("Datasets", validate_datasets)
+        ]
     ]
     
     all_passed = True
-    for check_name, check_func in checks:
-        try:
-            if check_func():
-                logger.info(f"✅ {check_name} check passed")
-            else:
-                logger.error(f"❌ {check_name} check failed")
-                all_passed = False
-        except Exception as e:
-            logger.error(f"❌ {check_name} check failed with error: {e}")
-            all_passed = False
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        for wave in waves:
+            futures = [(check_name, executor.submit(check_func)) for check_name, check_func in wave]
+            # Report in the listed order regardless of which check finishes first
+            for check_name, future in futures:
+                try:
+                    if future.result():
+                        logger.info(f"✅ {check_name} check passed")
+                    else:
+                        logger.error(f"❌ {check_name} check failed")
+                        all_passed = False
+                except Exception as e:
+                    logger.error(f"❌ {check_name} check failed with error: {e}")
+                    all_passed = False
     
     if all_passed:
         logger.info("🚀 All startup checks passed. Application ready!")
@@ -198,18 +283,12 @@ def create_default_prompts():
         }
     ]
     
-    templates_file = "data/prompt_templates.json"
-    if os.path.exists(templates_file):
-        try:
-            with open(templates_file, 'r', encoding='utf-8') as f:
-                existing = json.load(f)
-                if existing:  # Don't overwrite existing templates
-                    return
-        except:
-            pass
-    
-    with open(templates_file, 'w', encoding='utf-8') as f:
-        json.dump(default_templates, f, indent=2)
+    templates_file = "data/prompt_templates.jsonl"
+    if os.path.exists(templates_file) and os.path.getsize(templates_file) > 0:
+        return  # Don't overwrite existing templates
+    
+    with open(templates_file, 'wb') as f:
+        f.write(b"".join(_dumps_json(template) + b"\n" for template in default_templates))
 
 def main():
     """Main startup function"""
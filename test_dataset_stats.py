@@ -1,13 +1,12 @@
 """
 Test Dataset Statistics Functionality
 """
-import sys
+import json
 import os
-
-# Add the project directory to Python path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import tempfile
 
 from dataset_manager import dataset_manager
+from setup import _count_dataset_posts
 
 def test_dataset_stats():
     """Test the dataset statistics functionality"""
@@ -60,5 +59,27 @@ def test_dataset_stats():
     
     print("\n🎯 Test Complete!")
 
+def test_count_dataset_posts():
+    """Test that setup counts posts, not the values nested inside them"""
+    print("\n🔢 Testing Dataset Post Count")
+    
+    posts = [
+        {"text": "First", "tags": ["AI", "Careers"], "meta": {"links": [[1, 2], []]}},
+        {"text": "Second", "tags": [], "engagement": 5},
+        {"text": "Third", "tags": [["nested"], "flat"], "draft": None}
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = os.path.join(tmp, "posts.json")
+        with open(dataset, 'w', encoding='utf-8') as f:
+            json.dump(posts, f)
+        assert _count_dataset_posts(dataset) == len(posts)
+        
+        with open(dataset, 'w', encoding='utf-8') as f:
+            json.dump({"posts": posts}, f)
+        assert _count_dataset_posts(dataset) is None
+    
+    print(f"    ✅ Counted {len(posts)} posts with nested tag lists")
+
 if __name__ == "__main__":
     test_dataset_stats()
+    test_count_dataset_posts()
@@ -3,8 +3,24 @@
 Test script for dataset detection without Streamlit dependency
 """
 import os
+import re
 import json
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Optional raw prefix and the name stem, matched once per file
+_NAME_RE = re.compile(r'^(raw_|processed_raw_)?(.*?)(?:\.json)?$')
+
 def test_dataset_detection():
     print("=== DATASET DETECTION TEST ===")
     
@@ -27,20 +43,21 @@ def test_dataset_detection():
     for file in json_files:
         file_path = os.path.join(data_dir, file)
         
+        # Read the file once for both the processed check and its structure
+        try:
+            sample_post, post_count = scan_dataset(file_path)
+            read_error = None
+        except Exception as e:
+            sample_post, post_count, read_error = None, 0, e
+        
         # Check if processed
-        is_processed = check_if_processed(file_path)
+        is_processed = is_processed_post(sample_post)
         
         # Create display name
-        if file.startswith('raw_'):
-            display_name = file.replace('raw_', '').replace('.json', '').replace('_', ' ').title()
-            if is_processed:
-                display_name = f"{display_name}"
-            else:
-                display_name = f"{display_name} (Raw)"
-        elif file.startswith('processed_raw_'):
-            display_name = file.replace('processed_raw_', '').replace('.json', '').replace('_', ' ').title()
-        else:
-            display_name = file.replace('.json', '').replace('_', ' ').title()
+        prefix, stem = _NAME_RE.match(file).groups()
+        display_name = stem.replace('_', ' ').title()
+        if prefix == 'raw_' and not is_processed:
+            display_name = f"{display_name} (Raw)"
         
         if is_processed:
             processed_datasets[display_name] = file_path
@@ -50,15 +67,12 @@ def test_dataset_detection():
             print(f"⚠️  RAW: {display_name} <- {file}")
         
         # Show file structure
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            if data:
-                sample_keys = list(data[0].keys())
-                has_tags = 'tags' in data[0]
-                print(f"    Posts: {len(data)}, Keys: {sample_keys}, Has tags: {has_tags}")
-        except Exception as e:
-            print(f"    Error reading file: {e}")
+        if read_error:
+            print(f"    Error reading file: {read_error}")
+        elif post_count and isinstance(sample_post, dict):
+            sample_keys = list(sample_post.keys())
+            has_tags = 'tags' in sample_post
+            print(f"    Posts: {post_count}, Keys: {sample_keys}, Has tags: {has_tags}")
         print()
     
     print("=== FINAL RESULTS ===")
@@ -70,27 +84,38 @@ def test_dataset_detection():
     for name, path in raw_datasets.items():
         print(f"  ⚠️  {name}")
 
+def is_processed_post(post):
+    """A processed post has text and a non-empty list of tags"""
+    return (isinstance(post, dict) and 'text' in post
+            and isinstance(post.get('tags'), list) and len(post['tags']) > 0)
+
+def scan_dataset(file_path):
+    """Return (first post, post count) from a single pass over a dataset"""
+    if not IJSON_AVAILABLE:
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+        if not data or not isinstance(data, list):
+            return None, 0
+        return data[0], len(data)
+    
+    sample_post, post_count = None, 0
+    with open(file_path, 'rb') as f:
+        for post_count, post in enumerate(ijson.items(f, 'item'), 1):
+            if post_count == 1:
+                sample_post = post
+    return sample_post, post_count
+
 def check_if_processed(file_path):
     """Check if a dataset is processed"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        if not data or not isinstance(data, list):
-            return False
-        
-        sample_post = data[0]
-        
-        # Check required fields
-        if 'text' not in sample_post or 'tags' not in sample_post:
-            return False
-        
-        # Check if tags is a list and not empty
-        tags = sample_post.get('tags')
-        if not isinstance(tags, list) or len(tags) == 0:
-            return False
-        
-        return True
+        if IJSON_AVAILABLE:
+            # Only the first post is needed, so stop parsing after it
+            with open(file_path, 'rb') as f:
+                sample_post = next(ijson.items(f, 'item'), None)
+        else:
+            sample_post, _ = scan_dataset(file_path)
+        return is_processed_post(sample_post)
         
     except Exception as e:
         print(f"Error checking {file_path}: {e}")
@@ -4,52 +4,79 @@ Test the app behavior when no processed datasets are available
 import sys
 import os
 
-# Add the project directory to Python path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
 from dataset_manager import dataset_manager
 
+# Status markers and section icons shared by every report line; plain ASCII
+# when stdout is captured (CI logs) rather than a terminal
+if sys.stdout.isatty():
+    OK, WARN, BAD, INFO = "✅", "⚠️", "❌", "ℹ️"
+    TEST, STATS, EXPECT, LIST, TIP, EMPTY, DONE = "🧪", "📊", "📥", "📋", "💡", "📭", "🎯"
+else:
+    OK, WARN, BAD, INFO = "[OK]", "[WARN]", "[FAIL]", "[INFO]"
+    TEST, STATS, EXPECT, LIST, TIP, EMPTY, DONE = (
+        "[TEST]", "[STATS]", "[EXPECT]", "[LIST]", "[TIP]", "[NONE]", "[DONE]"
+    )
+
 def test_no_processed_datasets():
     """Test app behavior when only raw datasets exist"""
-    print("🧪 Testing No Processed Datasets Scenario")
-    print("=" * 50)
+    # Collect the report and write it in one go rather than print per line
+    out = [
+        f"{TEST} Testing No Processed Datasets Scenario",
+        "=" * 50
+    ]
     
     # Get current datasets
     available_datasets = dataset_manager.get_available_datasets()
     raw_datasets = dataset_manager.get_raw_datasets()
     
-    print(f"📊 **Dataset Status:**")
-    print(f"   ✅ Processed datasets: {len(available_datasets)}")
-    print(f"   ⚠️  Raw datasets: {len(raw_datasets)}")
-    print()
+    out += [
+        f"{STATS} **Dataset Status:**",
+        f"   {OK} Processed datasets: {len(available_datasets)}",
+        f"   {WARN}  Raw datasets: {len(raw_datasets)}",
+        ""
+    ]
     
     if not available_datasets:
-        print("✅ **Scenario Confirmed:** No processed datasets available")
-        print("📥 **Expected behavior:** App should show welcome screen with guidance")
-        print()
+        out += [
+            f"{OK} **Scenario Confirmed:** No processed datasets available",
+            f"{EXPECT} **Expected behavior:** App should show welcome screen with guidance",
+            ""
+        ]
         
         if raw_datasets:
-            print("📋 **Available Raw Datasets:**")
-            for i, (display_name, file_path) in enumerate(raw_datasets.items(), 1):
-                print(f"   {i}. {display_name}")
-                # Check file exists
-                if os.path.exists(file_path):
-                    print(f"      ✅ File exists: {file_path}")
-                else:
-                    print(f"      ❌ File missing: {file_path}")
-            print()
-            print("💡 **Recommendation:** Process these raw datasets in Dataset Manager")
+            # One directory read per folder instead of a stat per file
+            existing_files = set()
+            for data_dir in {os.path.dirname(file_path) for file_path in raw_datasets.values()}:
+                with os.scandir(data_dir or '.') as entries:
+                    existing_files.update(os.path.join(data_dir, entry.name) for entry in entries)
+            
+            out.append(f"{LIST} **Available Raw Datasets:**")
+            out += [
+                f"   {i}. {display_name}\n      "
+                + (f"{OK} File exists: {file_path}" if file_path in existing_files
+                   else f"{BAD} File missing: {file_path}")
+                for i, (display_name, file_path) in enumerate(raw_datasets.items(), 1)
+            ]
+            out += ["", f"{TIP} **Recommendation:** Process these raw datasets in Dataset Manager"]
         else:
-            print("📭 **No raw datasets found either**")
-            print("💡 **Recommendation:** Upload datasets in Dataset Manager")
+            out += [
+                f"{EMPTY} **No raw datasets found either**",
+                f"{TIP} **Recommendation:** Upload datasets in Dataset Manager"
+            ]
     else:
-        print("ℹ️  **Scenario:** Processed datasets are available")
-        print("📋 **Available Processed Datasets:**")
-        for i, (display_name, file_path) in enumerate(available_datasets.items(), 1):
-            print(f"   {i}. {display_name}")
+        out += [
+            f"{INFO}  **Scenario:** Processed datasets are available",
+            f"{LIST} **Available Processed Datasets:**"
+        ]
+        out += [f"   {i}. {display_name}" for i, display_name in enumerate(available_datasets, 1)]
     
-    print()
-    print("🎯 **Test Complete!**")
+    out += ["", f"{DONE} **Test Complete!**"]
+    sys.stdout.write("\n".join(out) + "\n")
 
 if __name__ == "__main__":
+    # Post text and dataset names can still hold emoji; escape what a
+    # non-terminal stream (e.g. a cp1252 CI console) can't encode
+    for stream in (sys.stdout, sys.stderr):
+        if not stream.isatty():
+            stream.reconfigure(errors="backslashreplace")
     test_no_processed_datasets()
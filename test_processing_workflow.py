@@ -1,16 +1,74 @@
 """
 Test the complete dataset processing workflow
 """
+import codecs
+import contextlib
+import io
+import json
 import sys
 import os
-sys.path.append('.')
+import tempfile
 
 from dataset_processor import DatasetProcessor
-import json
 
-def test_complete_workflow():
-    """Test the complete dataset processing workflow"""
-    print("🔄 Testing Complete Dataset Processing Workflow")
+# Status markers and section icons shared by every report line; plain ASCII
+# when stdout is captured (CI logs) rather than a terminal
+if sys.stdout.isatty():
+    OK, BAD = "✅", "❌"
+    RUN, FILE, STATS, POST, TEST = "🔄", "📁", "📊", "📝", "🎯"
+else:
+    OK, BAD = "[OK]", "[FAIL]"
+    RUN, FILE, STATS, POST, TEST = "[RUN]", "[FILE]", "[STATS]", "[POST]", "[TEST]"
+
+try:
+    import orjson
+    
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+except ImportError:
+    import json
+    
+    def _dumps(obj):
+        # pandas hands back numpy scalars, which json can't serialize directly
+        return json.dumps(obj, ensure_ascii=False, default=lambda o: o.item())
+
+# (label, stats key, format spec) for each line of the statistics report
+STATS_FIELDS = (
+    ("Total Posts", "total_posts", ""),
+    ("Languages", "languages", ""),
+    ("Lengths", "lengths", ""),
+    ("Tones", "tones", ""),
+    ("Audiences", "audiences", ""),
+    ("Average Engagement", "avg_engagement", ".1f"),
+    ("Unique Tags", "total_tags", "")
+)
+
+# (label, post field) for each metadata line of the sample post
+SAMPLE_FIELDS = (
+    ("Language", "language"),
+    ("Length", "length"),
+    ("Tags", "tags"),
+    ("Tone", "tone"),
+    ("Audience", "target_audience"),
+    ("Engagement", "engagement")
+)
+
+def test_complete_workflow(as_json=False):
+    """Test the complete dataset processing workflow; `as_json` writes only the stats
+    to stdout as one JSON document and sends the readable report to stderr"""
+    if not as_json:
+        _run_workflow()
+        return
+    
+    # Library code prints progress too, so all of it goes to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        stats = _run_workflow()
+    if stats:
+        sys.stdout.write(_dumps(stats) + "\n")
+
+def _run_workflow():
+    """Process the sample dataset and print the report; returns the stats, or None on failure"""
+    print(f"{RUN} Testing Complete Dataset Processing Workflow")
     print("=" * 60)
     
     # Initialize processor
@@ -20,57 +78,115 @@ def test_complete_workflow():
     raw_file = "data/sample_raw_dataset.json"
     processed_file = "data/processed_sample_dataset.json"
     
-    print(f"📁 Processing raw dataset: {raw_file}")
+    # A missing input is reported directly rather than through an exception
+    if not os.path.exists(raw_file):
+        print(f"{BAD} Raw dataset not found: {raw_file}")
+        return
+    
+    print(f"{FILE} Processing raw dataset: {raw_file}")
     
     try:
-        # Process the dataset
-        processor.process_existing_raw_dataset(raw_file, processed_file)
-        print(f"✅ Successfully processed dataset!")
-        print(f"📁 Processed file saved as: {processed_file}")
-        
-        # Get processing statistics
-        stats = processor.get_processing_stats(processed_file)
-        
-        print("\n📊 Processing Statistics:")
-        print(f"  Total Posts: {stats['total_posts']}")
-        print(f"  Languages: {stats['languages']}")
-        print(f"  Lengths: {stats['lengths']}")
-        print(f"  Tones: {stats['tones']}")
-        print(f"  Audiences: {stats['audiences']}")
-        print(f"  Average Engagement: {stats['avg_engagement']:.1f}")
-        print(f"  Unique Tags: {stats['total_tags']}")
-        
-        # Show sample processed post
-        with open(processed_file, 'r', encoding='utf-8') as f:
-            processed_data = json.load(f)
-        
-        print("\n📝 Sample Processed Post:")
-        sample_post = processed_data[0]
-        print(f"  Text: {sample_post['text'][:100]}...")
-        print(f"  Language: {sample_post['language']}")
-        print(f"  Length: {sample_post['length']}")
-        print(f"  Tags: {sample_post['tags']}")
-        print(f"  Tone: {sample_post['tone']}")
-        print(f"  Audience: {sample_post['target_audience']}")
-        print(f"  Engagement: {sample_post['engagement']}")
-        
-        # Test few-shot learning with processed dataset
-        print("\n🎯 Testing Few-Shot Learning with Processed Dataset:")
-        from few_shot import FewShotPosts
-        fs = FewShotPosts(processed_file)
-        print(f"  Loaded dataset: {len(fs.df)} posts")
-        print(f"  Available tags: {fs.get_tags()}")
-        
-        # Test filtering
-        if fs.get_tags():
-            first_tag = fs.get_tags()[0]
-            filtered_posts = fs.get_filtered_posts("Medium", "English", first_tag)
-            print(f"  Found {len(filtered_posts)} posts for tag '{first_tag}'")
-        
-        print("\n✅ Complete workflow test successful!")
+        # Process the dataset, keeping the processed posts in memory
+        df = processor.process_existing_raw_dataset(raw_file, processed_file)
         
+        # Get processing statistics from the same frame rather than re-reading the file
+        stats = processor.get_processing_stats(df)
     except Exception as e:
-        print(f"❌ Error in workflow: {e}")
+        print(f"{BAD} Error in workflow: {e}")
+        return
+    
+    if df.empty:
+        print(f"{BAD} No posts were processed from {raw_file}")
+        return
+    
+    # get_processing_stats logs its own errors and returns {} instead of raising
+    if not stats:
+        print(f"{BAD} Could not compute statistics for {processed_file}")
+        return
+    
+    print(f"{OK} Successfully processed dataset!")
+    print(f"{FILE} Processed file saved as: {processed_file}")
+    
+    # Show sample processed post
+    sample_post = df.iloc[0].to_dict()
+    
+    # Each report section is collected and written in one go
+    sys.stdout.write("\n".join([
+        "",
+        f"{STATS} Processing Statistics:",
+        *(f"  {label}: {stats[key]:{spec}}" for label, key, spec in STATS_FIELDS),
+        "",
+        f"{POST} Sample Processed Post:",
+        f"  Text: {sample_post['text'][:100]}...",
+        # Metadata extraction can leave fields out, so don't assume every one is there
+        *(f"  {label}: {sample_post.get(key, 'n/a')}" for label, key in SAMPLE_FIELDS),
+        "",
+        f"{TEST} Testing Few-Shot Learning with Processed Dataset:"
+    ]) + "\n")
+    
+    # Test few-shot learning with processed dataset; few_shot is only
+    # imported once processing has succeeded
+    from few_shot import FewShotPosts
+    fs = FewShotPosts.from_dataframe(df, processed_file)
+    out = [
+        f"  Loaded dataset: {len(fs.df)} posts",
+        f"  Available tags: {fs.get_tags()}"
+    ]
+    
+    # Test filtering
+    if fs.get_tags():
+        first_tag = fs.get_tags()[0]
+        filtered_posts = fs.get_filtered_posts("Medium", "English", first_tag)
+        out.append(f"  Found {len(filtered_posts)} posts for tag '{first_tag}'")
+    
+    out += ["", f"{OK} Complete workflow test successful!"]
+    sys.stdout.write("\n".join(out) + "\n")
+    return stats
+
+def test_uploaded_dataset_encodings():
+    """Uploads with a UTF-8 BOM or in UTF-16 preview, then save as plain UTF-8"""
+    from main import _preview_upload
+    
+    posts = [{"text": "Café launch day 🚀\nThanks everyone!", "engagement": 12}]
+    body = json.dumps(posts, ensure_ascii=False)
+    uploads = (
+        ("bom_upload", codecs.BOM_UTF8 + body.encode('utf-8')),
+        ("utf16_upload", body.encode('utf-16'))
+    )
+    
+    processor = DatasetProcessor()
+    # Skip the LLM; only the file handling is under test
+    processor.extract_post_metadata = processor.get_default_metadata
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.mkdir("data")
+        try:
+            for name, data in uploads:
+                upload = io.BytesIO(data)
+                upload.name = f"{name}.json"
+                
+                post_count, preview = _preview_upload(upload)
+                assert (post_count, preview) == (1, posts), f"{name}: preview got {preview}"
+                
+                processed_file = processor.process_uploaded_dataset(upload, name)
+                # Every reader opens dataset files as plain UTF-8
+                with open(f"data/raw_{name}.json", encoding='utf-8') as f:
+                    assert json.load(f) == posts, f"{name}: raw copy differs"
+                with open(processed_file, encoding='utf-8') as f:
+                    assert json.load(f)[0]['text'] == posts[0]['text']
+                print(f"{OK} {name} previewed and saved as UTF-8")
+        finally:
+            os.chdir(cwd)
+    
 
 if __name__ == "__main__":
-    test_complete_workflow()
+    # Post text and dataset names can still hold emoji; escape what a
+    # non-terminal stream (e.g. a cp1252 CI console) can't encode
+    for stream in (sys.stdout, sys.stderr):
+        if not stream.isatty():
+            stream.reconfigure(errors="backslashreplace")
+    test_complete_workflow(as_json='--json' in sys.argv[1:])
+    if '--json' not in sys.argv[1:]:
+        test_uploaded_dataset_encodings()